@@ -0,0 +1,63 @@
+"""Compare the single-pass aggregations with the notebook's per-group loops.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_aggregate --rows 200000 --majors 2000
+"""
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from college_majors.aggregate import (aggregate_major_categories, aggregate_major_categories_loop,
+                                      aggregate_majors, aggregate_majors_loop)
+
+
+def synthetic_grads(rows, n_majors, n_categories=16, seed=0):
+    """Random frame with the columns the aggregations read."""
+    rng = np.random.default_rng(seed)
+    major_ids = rng.integers(0, n_majors, rows)
+    total = rng.integers(100, 400000, rows)
+    women = (total * rng.random(rows)).astype('int64')
+    return pd.DataFrame({
+        'Major': np.char.add('MAJOR ', major_ids.astype(str)),
+        'Major_category': np.char.add('CATEGORY ', (major_ids % n_categories).astype(str)),
+        'Total': total,
+        'Women': women,
+        'Men': total - women,
+        'ShareWomen': women / total,
+        'Median': rng.integers(20, 111, rows) * 1000,
+    })
+
+
+def _time(func, data, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(data)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=100000)
+    parser.add_argument('--majors', type=int, default=1000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args(argv)
+
+    data = synthetic_grads(args.rows, args.majors)
+    print("{} rows, {} majors".format(args.rows, data['Major'].nunique()))
+    for name, fast, loop in [('majors', aggregate_majors, aggregate_majors_loop),
+                             ('major_categories', aggregate_major_categories, aggregate_major_categories_loop)]:
+        fast_time, fast_result = _time(fast, data, args.repeat)
+        loop_time, loop_result = _time(loop, data, 1)
+        pd.testing.assert_frame_equal(fast_result, loop_result, check_exact=False)
+        print("{:<17} single pass {:9.4f}s   loop {:9.4f}s   speedup {:8.1f}x".format(
+            name, fast_time, loop_time, loop_time / fast_time))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,75 @@
+"""Memory of the notebook's frame against its compact form, and a check that results agree.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_compact --scale 1000
+"""
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from college_majors.aggregate import aggregate_major_categories, aggregate_majors
+from college_majors.compact import compact_frame, with_derived
+from college_majors.compare import top_bottom
+from college_majors.correlations import correlation_report
+from college_majors.hist import predominant_fraction
+from college_majors.load import add_derived_columns
+from college_majors.percentiles import salary_percentiles
+
+from .synthetic import scaled_recent_grads
+
+
+def analyses(recent_grads):
+    """The headline results, as `{name: frame or number}`."""
+    recent_grads = with_derived(recent_grads)
+    return {
+        'majors': aggregate_majors(recent_grads),
+        'major_categories': aggregate_major_categories(recent_grads),
+        'predominantly_female': predominant_fraction(recent_grads, 'ShareWomen'),
+        'predominantly_male': predominant_fraction(recent_grads, 'ShareMen'),
+        'top_bottom_sharewomen': top_bottom(recent_grads, 'ShareWomen').frame,
+        'salary_percentiles': salary_percentiles(recent_grads),
+        'correlations': correlation_report(recent_grads, n_boot=0),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--scale', type=int, default=1, help="multiple of the real file's 173 rows")
+    args = parser.parse_args(argv)
+
+    # As the notebook builds it: read_csv, dropna, derived columns
+    if args.scale == 1:
+        recent_grads = pd.read_csv('recent-grads.csv')
+    else:
+        recent_grads = scaled_recent_grads(args.scale)
+        recent_grads = recent_grads.astype(dict((c, 'float64') for c in ['Total', 'Men', 'Women']))
+        # Resampling repeats ranks; make them unique as in the real file so top/bottom has no ties
+        recent_grads['Rank'] = np.arange(1, len(recent_grads) + 1)
+    recent_grads = add_derived_columns(recent_grads.dropna())
+
+    start = time.perf_counter()
+    compact, memory = compact_frame(recent_grads)
+    print("{} rows, compacted in {:.3f}s".format(len(recent_grads), time.perf_counter() - start))
+    print(memory)
+    for column in recent_grads.columns:
+        print("  {:<22} {:>10} -> {}".format(column, str(recent_grads[column].dtype),
+                                              compact[column].dtype if column in compact else '(on demand)'))
+
+    wide, narrow = analyses(recent_grads), analyses(compact)
+    for name, expected in wide.items():
+        actual = narrow[name]
+        if isinstance(expected, pd.DataFrame):
+            # Categorical labels and narrower integer columns are expected; values are not
+            pd.testing.assert_frame_equal(actual, expected, check_dtype=False, check_index_type=False,
+                                          check_categorical=False, check_exact=True)
+        else:
+            assert actual == expected or (np.isnan(actual) and np.isnan(expected)), (name, actual, expected)
+    print("{} analyses identical".format(len(wide)))
+
+
+if __name__ == '__main__':
+    main()
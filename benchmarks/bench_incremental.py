@@ -0,0 +1,54 @@
+"""Time monthly-style batch updates against a full recompute, and check they agree.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_incremental --rows 500000 --batch 5000
+"""
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from college_majors.aggregate import IncrementalAggregates, aggregate_major_categories, aggregate_majors
+from college_majors.hist import predominant_fraction
+
+from .bench_aggregate import synthetic_grads
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=200000)
+    parser.add_argument('--majors', type=int, default=1000)
+    parser.add_argument('--batch', type=int, default=5000)
+    args = parser.parse_args(argv)
+
+    data = synthetic_grads(args.rows, args.majors)
+    data.loc[data.sample(frac=0.01, random_state=1).index, 'Median'] = np.nan
+    first = len(data) - 4 * args.batch
+    initial = data[:first]
+    batches = [data[first + i * args.batch:first + (i + 1) * args.batch] for i in range(4)]
+
+    aggregates = IncrementalAggregates().update(initial)
+    seen = initial
+    for batch in batches:
+        start = time.perf_counter()
+        aggregates.update(batch)
+        update_time = time.perf_counter() - start
+        seen = pd.concat([seen, batch])
+
+        start = time.perf_counter()
+        majors = aggregate_majors(seen)
+        major_categories = aggregate_major_categories(seen)
+        full_time = time.perf_counter() - start
+
+        pd.testing.assert_frame_equal(aggregates.majors(), majors)
+        pd.testing.assert_frame_equal(aggregates.major_categories(), major_categories)
+        assert aggregates.predominant_fraction() == predominant_fraction(seen)
+        print("{} rows: batch update {:8.4f}s   full recompute {:8.4f}s   results identical".format(
+            len(seen), update_time, full_time))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,182 @@
+"""Time every stage of the pipeline on synthetic data and compare with a stored baseline.
+
+Run from the repository root:
+
+    python -m benchmarks.run                        # 1x, 100x and 10,000x the real rows
+    python -m benchmarks.run --scale 1 --scale 100 --save-baseline
+    python -m benchmarks.run --baseline benchmarks/baseline.json
+
+Each stage is timed (best of `--repeat`) and then run once more under
+`tracemalloc` to record its peak allocation. Stages that got slower or larger
+than the baseline by more than `--tolerance` are flagged, and the exit status
+is 1 when anything regressed.
+"""
+
+import argparse
+import io
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import matplotlib
+import pandas as pd
+
+from college_majors.aggregate import (aggregate_major_categories, aggregate_major_categories_loop,
+                                      aggregate_majors, aggregate_majors_loop)
+from college_majors.hist import HistogramIndex
+from college_majors.load import add_derived_columns, read_recent_grads
+from college_majors.plots import HIST_COLUMNS
+from college_majors.validate import validate
+
+from .synthetic import scaled_recent_grads
+
+
+DEFAULT_SCALES = [1, 100, 10000]
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), 'baseline.json')
+
+# Figures timed per plot family
+PLOT_FAMILIES = {
+    'scatter': ['median_vs_sample_size', 'median_vs_sharewomen_zoomed', 'median_sal_vs_total_grads'],
+    'hist': ['column_histograms', 'sharewomen_histogram', 'median_histogram'],
+    'scatter_matrix': ['sample_size_median_unemployment_matrix'],
+    'bar': ['top_bottom_sharewomen', 'category_shares', 'category_jobs'],
+    'box': ['median_box', 'unemployment_rate_box'],
+    'hexbin': ['unemployment_rate_vs_sharewomen_hexbin'],
+}
+
+# The notebook's loops take minutes beyond this many rows
+LOOP_MAX_ROWS = 20000
+
+# Regressions smaller than these are noise
+MIN_SECONDS = 0.005
+MIN_BYTES = 1 << 20
+
+
+def _render(recent_grads, names):
+    from college_majors.plots import FIGURES
+    for name in names:
+        FIGURES[name](recent_grads).savefig(io.BytesIO(), format='png')
+
+
+def stages(csv_path):
+    """`(name, kind, func)` for every stage, in pipeline order; later stages read earlier ones' output."""
+    state = {}
+
+    def read_csv(_):
+        state['raw'] = pd.read_csv(csv_path)
+
+    def dropna(_):
+        state['clean'] = state['raw'].dropna()
+
+    def derive(_):
+        state['grads'] = add_derived_columns(state['clean'].copy())
+
+    result = [
+        ('load.read_csv', None, read_csv),
+        ('load.chunked', None, lambda _: read_recent_grads(csv_path)),
+        ('clean.dropna', None, dropna),
+        ('clean.validate', None, lambda _: validate(state['raw'])),
+        ('derive.share_columns', None, derive),
+        ('aggregate.majors', None, lambda _: aggregate_majors(state['grads'])),
+        ('aggregate.major_categories', None, lambda _: aggregate_major_categories(state['grads'])),
+        ('aggregate.majors_loop', 'loop', lambda _: aggregate_majors_loop(state['grads'])),
+        ('aggregate.major_categories_loop', 'loop', lambda _: aggregate_major_categories_loop(state['grads'])),
+        ('aggregate.histograms', None, lambda _: HistogramIndex(state['grads']).compute(HIST_COLUMNS)),
+    ]
+    for family, names in PLOT_FAMILIES.items():
+        result.append(('render.' + family, None, lambda _, names=names: _render(state['grads'], names)))
+    return result
+
+
+def _measure(func, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(None)
+        best = min(best, time.perf_counter() - start)
+    tracemalloc.start()
+    try:
+        func(None)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return best, peak
+
+
+def run(scales, repeat=3, source='recent-grads.csv'):
+    """Results as `{scale: {stage: {'rows', 'seconds', 'peak_bytes'}}}`."""
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for scale in scales:
+            frame = scaled_recent_grads(scale, source)
+            csv_path = os.path.join(tmp, 'recent-grads-x{}.csv'.format(scale))
+            frame.to_csv(csv_path, index=False)
+            rows = len(frame)
+            del frame
+            results[str(scale)] = {}
+            for name, kind, func in stages(csv_path):
+                if kind == 'loop' and rows > LOOP_MAX_ROWS:
+                    continue
+                seconds, peak = _measure(func, 1 if scale >= 1000 else repeat)
+                results[str(scale)][name] = {'rows': rows, 'seconds': seconds, 'peak_bytes': peak}
+                print("x{:<6} {:<34} {:10.4f}s {:10.1f} MiB".format(scale, name, seconds, peak / 2 ** 20))
+                sys.stdout.flush()
+    return results
+
+
+def regressions(results, baseline, tolerance):
+    """List of `(scale, stage, metric, baseline, current)` that exceed the tolerance."""
+    found = []
+    for scale, stage_results in results.items():
+        for stage, current in stage_results.items():
+            previous = baseline.get(scale, {}).get(stage)
+            if previous is None:
+                continue
+            for metric, floor in [('seconds', MIN_SECONDS), ('peak_bytes', MIN_BYTES)]:
+                if current[metric] > previous[metric] * (1 + tolerance) and \
+                        current[metric] - previous[metric] > floor:
+                    found.append((scale, stage, metric, previous[metric], current[metric]))
+    return found
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--scale', dest='scales', type=int, action='append',
+                        help="multiple of the real row count, may be repeated (default: 1, 100, 10000)")
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--source', default='recent-grads.csv')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE)
+    parser.add_argument('--tolerance', type=float, default=0.25, help="allowed relative slowdown/growth")
+    parser.add_argument('--save-baseline', action='store_true', help="store these results as the new baseline")
+    parser.add_argument('--output', help="also write the results to this JSON file")
+    args = parser.parse_args(argv)
+
+    matplotlib.use('Agg')
+    results = run(args.scales or DEFAULT_SCALES, args.repeat, args.source)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+    if args.save_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump(results, f, indent=2)
+        print("Saved baseline to {}".format(args.baseline))
+        return 0
+    if not os.path.exists(args.baseline):
+        print("No baseline at {}; run with --save-baseline to create one".format(args.baseline))
+        return 0
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    found = regressions(results, baseline, args.tolerance)
+    for scale, stage, metric, previous, current in found:
+        print("REGRESSION x{} {} {}: {:.4g} -> {:.4g}".format(scale, stage, metric, previous, current))
+    if not found:
+        print("No regressions against {}".format(args.baseline))
+    return 1 if found else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,44 @@
+"""Synthetic recent-grads-shaped data at any multiple of the real 173 rows."""
+
+import numpy as np
+import pandas as pd
+
+
+# Distinct majors grow with the scale up to this many copies of the real list
+MAX_MAJOR_COPIES = 20
+
+
+def scaled_recent_grads(scale, source='recent-grads.csv', seed=0):
+    """`scale` x the rows of `source`, with jittered counts and the same null rate.
+
+    Rows are resampled from the real file, counts are perturbed by up to +/-20%
+    and the dependent columns (Total, ShareWomen, Unemployment_rate) are
+    recomputed so the usual invariants still hold.
+    """
+    rng = np.random.default_rng(seed)
+    real = pd.read_csv(source)
+    clean = real.dropna().reset_index(drop=True)
+    rows = len(real) * scale
+    picks = rng.integers(0, len(clean), rows)
+    frame = clean.iloc[picks].reset_index(drop=True)
+
+    copy = rng.integers(0, min(scale, MAX_MAJOR_COPIES), rows)
+    if scale > 1:
+        frame['Major'] = frame['Major'] + np.where(copy > 0, ' #' + copy.astype(str), '')
+
+    factor = rng.uniform(0.8, 1.2, rows)
+    for column in ['Men', 'Women', 'Sample_size', 'Employed', 'Full_time', 'Part_time', 'Full_time_year_round',
+                   'Unemployed', 'College_jobs', 'Non_college_jobs', 'Low_wage_jobs']:
+        frame[column] = (frame[column] * factor * rng.uniform(0.9, 1.1, rows)).round().astype('int64')
+    frame['Total'] = frame['Men'] + frame['Women']
+    frame['ShareWomen'] = frame['Women'] / frame['Total'].where(frame['Total'] > 0)
+    frame['Unemployment_rate'] = frame['Unemployed'] / (frame['Unemployed'] + frame['Employed']).where(
+        frame['Unemployed'] + frame['Employed'] > 0)
+    for column in ['Median', 'P25th', 'P75th']:
+        frame[column] = (frame[column] * rng.uniform(0.95, 1.05, rows)).round(-2)
+
+    # Keep the real file's share of rows with a gap (1 in 173)
+    gaps = rng.random(rows) < (len(real) - len(clean)) / len(real)
+    frame[['Total', 'Men', 'Women']] = frame[['Total', 'Men', 'Women']].astype('Int64')
+    frame.loc[gaps, ['Total', 'Men', 'Women', 'ShareWomen']] = np.nan
+    return frame[real.columns]
@@ -0,0 +1,39 @@
+"""Reusable pieces of the "Visualizing Earnings Based On College Majors" analysis.
+
+The loading, cleaning and aggregation API only needs pandas and NumPy. The
+plotting names (`scatter`, `scatter_matrix`, `FIGURES`, `render_all`, ...) are
+resolved on first access, so matplotlib is imported only when a plot is
+actually requested.
+"""
+
+import importlib
+
+from .aggregate import IncrementalAggregates, aggregate_major_categories, aggregate_majors
+from .compare import TopBottom, top_bottom
+from .hist import HistogramIndex, histogram_index, predominant_fraction
+from .load import LoadStats, add_derived_columns, clean, iter_recent_grads, read_recent_grads, stream_aggregate
+
+
+# Plotting names and the module each one lives in
+_LAZY = {
+    'FIGURES': '.plots',
+    'scatter': '.plots',
+    'scatter_matrix': '.matrix',
+    'render_all': '.render',
+    'render_figure': '.render',
+}
+
+__all__ = [
+    'IncrementalAggregates', 'aggregate_major_categories', 'aggregate_majors',
+    'TopBottom', 'top_bottom',
+    'HistogramIndex', 'histogram_index', 'predominant_fraction',
+    'LoadStats', 'add_derived_columns', 'clean', 'iter_recent_grads', 'read_recent_grads', 'stream_aggregate',
+] + list(_LAZY)
+
+
+def __getattr__(name):
+    if name in _LAZY:
+        value = getattr(importlib.import_module(_LAZY[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError("module {!r} has no attribute {!r}".format(__name__, name))
@@ -0,0 +1,253 @@
+"""Grouped aggregations behind the `majors` (In[16]-In[18]) and `major_categories` (In[37]-In[39]) frames.
+
+The notebook builds each frame with one `for` loop per column, masking the whole
+of `recent_grads` for every group. Here the grouping column is factorized once
+and every column is reduced with a single `np.bincount`, so the cost is
+O(rows) whatever the number of majors.
+"""
+
+import numpy as np
+import pandas as pd
+
+from .profiling import profiler
+
+
+# Columns of the per-group partial sums; keeping sums and counts (instead of means)
+# lets new rows be folded in without revisiting the old ones.
+MAJOR_PARTIALS = ['women_sum', 'men_sum', 'median_sum', 'median_count']
+CATEGORY_PARTIALS = ['sharewomen_sum', 'sharewomen_count', 'sharemen_sum', 'sharemen_count']
+
+
+def _factorize(keys):
+    # Codes in order of first appearance, like `Series.unique()` in In[15]/In[36]
+    codes, uniques = pd.factorize(np.asarray(keys), sort=False)
+    return codes, pd.Index(uniques, name=None)
+
+
+def _group_sum_count(codes, n_groups, values):
+    # NaN-skipping sum and count per group, matching `Series.sum()`/`Series.mean()`
+    values = np.asarray(values, dtype='float64')
+    valid = ~np.isnan(values) & (codes >= 0)
+    sums = np.bincount(codes[valid], weights=values[valid], minlength=n_groups)
+    counts = np.bincount(codes[valid], minlength=n_groups)
+    return sums, counts
+
+
+def _like(sums, column):
+    # Keep integer counts integral, as `Series.sum()` does
+    if pd.api.types.is_integer_dtype(column.dtype):
+        return sums.round().astype('int64')
+    return sums
+
+
+def _mean(sums, counts):
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where(counts > 0, sums / np.maximum(counts, 1), np.nan)
+
+
+def major_partials(recent_grads):
+    """Per-major sums of `Women`/`Men` and sum/count of `Median`."""
+    codes, index = _factorize(recent_grads['Major'])
+    n = len(index)
+    women_sum, _ = _group_sum_count(codes, n, recent_grads['Women'])
+    men_sum, _ = _group_sum_count(codes, n, recent_grads['Men'])
+    median_sum, median_count = _group_sum_count(codes, n, recent_grads['Median'])
+    return pd.DataFrame({'women_sum': _like(women_sum, recent_grads['Women']),
+                         'men_sum': _like(men_sum, recent_grads['Men']),
+                         'median_sum': median_sum,
+                         'median_count': median_count}, index=index)
+
+
+def category_partials(recent_grads):
+    """Per-category sum/count of `ShareWomen` and `ShareMen`.
+
+    `ShareMen` is derived as `1 - ShareWomen` (In[27]) when the column is absent.
+    """
+    codes, index = _factorize(recent_grads['Major_category'])
+    n = len(index)
+    share_women = recent_grads['ShareWomen']
+    if 'ShareMen' in recent_grads:
+        share_men = recent_grads['ShareMen']
+    else:
+        share_men = 1 - share_women
+    sw_sum, sw_count = _group_sum_count(codes, n, share_women)
+    sm_sum, sm_count = _group_sum_count(codes, n, share_men)
+    return pd.DataFrame({'sharewomen_sum': sw_sum,
+                         'sharewomen_count': sw_count,
+                         'sharemen_sum': sm_sum,
+                         'sharemen_count': sm_count}, index=index)
+
+
+def finalize_majors(partials):
+    """Turn `major_partials` into the notebook's `majors` frame."""
+    women = partials['women_sum']
+    men = partials['men_sum']
+    majors = pd.DataFrame({'total_grads': men + women}, index=partials.index)
+    majors['women_grads'] = women
+    majors['men_grads'] = men
+    majors['median_sal'] = _mean(partials['median_sum'].to_numpy(), partials['median_count'].to_numpy())
+    # Same ordering as In[18]: most popular majors first, ties broken by salary
+    majors.sort_values(by=['total_grads', 'median_sal'], ascending=False, inplace=True)
+    return majors
+
+
+def finalize_major_categories(partials):
+    """Turn `category_partials` into the notebook's `major_categories` frame."""
+    major_categories = pd.DataFrame(
+        {'sharewomen': _mean(partials['sharewomen_sum'].to_numpy(), partials['sharewomen_count'].to_numpy())},
+        index=partials.index)
+    major_categories['sharemen'] = _mean(partials['sharemen_sum'].to_numpy(), partials['sharemen_count'].to_numpy())
+    # Same ordering as In[39]
+    major_categories.sort_values(by=['sharewomen'], inplace=True)
+    return major_categories
+
+
+def aggregate_majors(recent_grads):
+    """`majors` frame (total_grads, women_grads, men_grads, median_sal) indexed by `Major`."""
+    with profiler.stage('aggregate_majors', rows=len(recent_grads)):
+        return finalize_majors(major_partials(recent_grads))
+
+
+def aggregate_major_categories(recent_grads):
+    """`major_categories` frame (sharewomen, sharemen) indexed by `Major_category`."""
+    with profiler.stage('aggregate_major_categories', rows=len(recent_grads)):
+        return finalize_major_categories(category_partials(recent_grads))
+
+
+class _RunningSums:
+    """NaN-skipping running sums and counts of several columns, per group key."""
+
+    def __init__(self, columns):
+        self.columns = list(columns)
+        self.positions = {}
+        self.keys = []
+        self.sums = np.zeros((0, len(self.columns)))
+        self.counts = np.zeros((0, len(self.columns)), dtype='int64')
+        self.integral = None
+
+    def _grow(self, size):
+        if size > len(self.sums):
+            capacity = max(size, 2 * len(self.sums), 16)
+            sums = np.zeros((capacity, len(self.columns)))
+            counts = np.zeros((capacity, len(self.columns)), dtype='int64')
+            sums[:len(self.sums)] = self.sums
+            counts[:len(self.counts)] = self.counts
+            self.sums, self.counts = sums, counts
+
+    def add(self, keys, batch):
+        codes, uniques = pd.factorize(np.asarray(keys), sort=False)
+        # Map the batch's own groups onto the running ones; new groups go last,
+        # in order of first appearance, exactly as a full `pd.factorize` would
+        mapping = np.empty(len(uniques), dtype='intp')
+        for i, key in enumerate(uniques):
+            position = self.positions.get(key)
+            if position is None:
+                position = self.positions[key] = len(self.keys)
+                self.keys.append(key)
+            mapping[i] = position
+        self._grow(len(self.keys))
+        rows = mapping[codes]
+
+        values = batch[self.columns].to_numpy(dtype='float64', na_value=np.nan)
+        valid = ~np.isnan(values)
+        np.add.at(self.sums, rows, np.where(valid, values, 0.0))
+        np.add.at(self.counts, rows, valid)
+        if self.integral is None:
+            self.integral = [pd.api.types.is_integer_dtype(batch[c].dtype) for c in self.columns]
+
+    def frame(self, names):
+        n = len(self.keys)
+        data = {}
+        for j, column in enumerate(self.columns):
+            sums = self.sums[:n, j]
+            if self.integral and self.integral[j]:
+                sums = sums.round().astype('int64')
+            data[names[column][0]] = sums
+            if names[column][1] is not None:
+                data[names[column][1]] = self.counts[:n, j]
+        return pd.DataFrame(data, index=pd.Index(self.keys[:n]))
+
+
+class IncrementalAggregates:
+    """Running `majors`/`major_categories` state that new survey rows update in O(batch).
+
+    Feed cleaned batches to `update`; `majors()`, `major_categories()` and
+    `predominant_fraction()` then equal a full recompute over every row seen.
+    """
+
+    _MAJOR_NAMES = {'Women': ('women_sum', None), 'Men': ('men_sum', None), 'Median': ('median_sum', 'median_count')}
+    _CATEGORY_NAMES = {'ShareWomen': ('sharewomen_sum', 'sharewomen_count'),
+                       'ShareMen': ('sharemen_sum', 'sharemen_count')}
+
+    def __init__(self):
+        self._majors = _RunningSums(['Women', 'Men', 'Median'])
+        self._categories = _RunningSums(['ShareWomen', 'ShareMen'])
+        self.row_count = 0
+        self._predominant = {'ShareWomen': 0, 'ShareMen': 0}
+
+    def update(self, batch):
+        """Fold a batch of cleaned rows into the running sums and return `self`."""
+        if 'ShareMen' not in batch:
+            batch = batch.assign(ShareMen=1 - batch['ShareWomen'])
+        self._majors.add(batch['Major'], batch)
+        self._categories.add(batch['Major_category'], batch)
+        self.row_count += len(batch)
+        for share in self._predominant:
+            # Upper bar of the two-bin (0, 1) histogram, as in hist.predominant_fraction
+            values = batch[share].to_numpy(dtype='float64', na_value=np.nan)
+            self._predominant[share] += int(np.count_nonzero((values >= 0.5) & (values <= 1)))
+        return self
+
+    def major_partials(self):
+        return self._majors.frame(self._MAJOR_NAMES)
+
+    def category_partials(self):
+        return self._categories.frame(self._CATEGORY_NAMES)
+
+    def majors(self):
+        return finalize_majors(self.major_partials())
+
+    def major_categories(self):
+        return finalize_major_categories(self.category_partials())
+
+    def predominant_fraction(self, share='ShareWomen'):
+        return self._predominant[share] / self.row_count
+
+
+def aggregate_majors_loop(recent_grads):
+    """Reference implementation: the per-major mask loops of In[15]-In[18]."""
+    majors = recent_grads["Major"].unique()
+    median = {}
+    women = {}
+    men = {}
+    for m in majors:
+        median[m] = recent_grads.loc[recent_grads["Major"] == m, "Median"].mean()
+    for m in majors:
+        women[m] = recent_grads.loc[recent_grads["Major"] == m, "Women"].sum()
+    for m in majors:
+        men[m] = recent_grads.loc[recent_grads["Major"] == m, "Men"].sum()
+    median_s = pd.Series(median)
+    women_s = pd.Series(women)
+    men_s = pd.Series(men)
+    majors = pd.DataFrame(men_s + women_s, columns=['total_grads'])
+    majors["women_grads"] = women_s
+    majors["men_grads"] = men_s
+    majors["median_sal"] = median_s
+    majors.sort_values(by=['total_grads', 'median_sal'], ascending=False, inplace=True)
+    return majors
+
+
+def aggregate_major_categories_loop(recent_grads):
+    """Reference implementation: the per-category mask loops of In[36]-In[39]."""
+    categories = recent_grads["Major_category"].unique()
+    share_men = recent_grads["ShareMen"] if "ShareMen" in recent_grads else 1 - recent_grads["ShareWomen"]
+    women = {}
+    men = {}
+    for c in categories:
+        women[c] = recent_grads.loc[recent_grads["Major_category"] == c, "ShareWomen"].mean()
+    for c in categories:
+        men[c] = share_men[recent_grads["Major_category"] == c].mean()
+    major_categories = pd.DataFrame(pd.Series(women), columns=['sharewomen'])
+    major_categories["sharemen"] = pd.Series(men)
+    major_categories.sort_values(by=['sharewomen'], inplace=True)
+    return major_categories
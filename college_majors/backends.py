@@ -0,0 +1,112 @@
+"""Execution backends for the load -> dropna -> derive -> aggregate pipeline.
+
+`run_pipeline(path, backend)` returns `(majors, major_categories, stats)`:
+
+* `'pandas'` (default) streams the CSV in chunks through `IncrementalAggregates`.
+* `'polars'` expresses the same steps as a lazy Polars query plan, which Polars
+  optimizes, runs multi-threaded with its streaming engine and never
+  materializes in full, so inputs larger than memory work. Requires `polars`.
+* `'auto'` picks Polars for files of `AUTO_POLARS_BYTES` or more when it is
+  installed, pandas otherwise.
+
+Both produce frames identical to the notebook's up to floating-point summation
+order.
+"""
+
+import os
+
+import pandas as pd
+
+from .aggregate import finalize_major_categories, finalize_majors
+from .load import COUNT_COLUMNS, DEFAULT_CHUNKSIZE, RATE_COLUMNS, LoadStats, stream_aggregate
+
+
+AUTO_POLARS_BYTES = 1 << 30
+
+
+class PandasBackend:
+    name = 'pandas'
+
+    def __init__(self, chunksize=DEFAULT_CHUNKSIZE):
+        self.chunksize = chunksize
+
+    def run(self, path):
+        return stream_aggregate(path, self.chunksize)
+
+
+class PolarsBackend:
+    name = 'polars'
+
+    def __init__(self):
+        try:
+            import polars
+        except ImportError:
+            raise ImportError("The polars backend needs polars: pip install polars")
+        self.pl = polars
+
+    def plan(self, path):
+        """Lazy frames for the raw row count, the cleaned rows and both aggregations."""
+        pl = self.pl
+        # Counts are parsed as floats, since exports may write them as "123.0", and
+        # narrowed once the null rows are gone; their sums are taken in Int64, as a
+        # major's Int32 counts can add up past 2**31
+        header = pl.scan_csv(path).collect_schema().names()
+        counts = [c for c in COUNT_COLUMNS if c in header]
+        raw = pl.scan_csv(path, schema_overrides=dict(
+            [(c, pl.Float64) for c in counts] + [(c, pl.Float32) for c in RATE_COLUMNS if c in header]))
+        cleaned = raw.drop_nulls().with_columns(pl.col(counts).cast(pl.Int32)).with_columns(
+            (pl.col('Full_time') / pl.col('Total')).alias('ShareFull_time'),
+            (1 - pl.col('ShareWomen')).alias('ShareMen'))
+        majors = cleaned.group_by('Major', maintain_order=True).agg(
+            pl.col('Women').cast(pl.Int64).sum().alias('women_sum'),
+            pl.col('Men').cast(pl.Int64).sum().alias('men_sum'),
+            pl.col('Median').cast(pl.Float64).sum().alias('median_sum'),
+            pl.col('Median').count().alias('median_count'))
+        categories = cleaned.group_by('Major_category', maintain_order=True).agg(
+            pl.col('ShareWomen').cast(pl.Float64).sum().alias('sharewomen_sum'),
+            pl.col('ShareWomen').count().alias('sharewomen_count'),
+            pl.col('ShareMen').cast(pl.Float64).sum().alias('sharemen_sum'),
+            pl.col('ShareMen').count().alias('sharemen_count'))
+        return raw.select(pl.len()), cleaned.select(pl.len()), majors, categories
+
+    def _collect(self, frames):
+        try:
+            return self.pl.collect_all(frames, engine='streaming')
+        except TypeError:
+            # Polars releases before the `engine` argument
+            return self.pl.collect_all(frames, streaming=True)
+
+    def run(self, path):
+        raw_count, cleaned_count, majors, categories = self._collect(list(self.plan(path)))
+        stats = LoadStats()
+        stats.raw_data_count = raw_count.item()
+        stats.cleaned_data_count = cleaned_count.item()
+        majors = pd.DataFrame(majors.drop('Major').to_dict(as_series=False),
+                              index=pd.Index(majors['Major'].to_list()))
+        categories = pd.DataFrame(categories.drop('Major_category').to_dict(as_series=False),
+                                  index=pd.Index(categories['Major_category'].to_list()))
+        return finalize_majors(majors), finalize_major_categories(categories), stats
+
+
+BACKENDS = {'pandas': PandasBackend, 'polars': PolarsBackend}
+
+
+def get_backend(name='pandas', path=None):
+    """Backend instance by name; `'auto'` decides from the size of `path`."""
+    if name == 'auto':
+        name = 'pandas'
+        if path is not None and os.path.getsize(path) >= AUTO_POLARS_BYTES:
+            try:
+                return PolarsBackend()
+            except ImportError:
+                pass
+    if name not in BACKENDS:
+        raise ValueError("Unknown backend {!r}; choose from {}".format(name, ', '.join(BACKENDS)))
+    return BACKENDS[name]()
+
+
+def run_pipeline(path='recent-grads.csv', backend='pandas'):
+    """`(majors, major_categories, stats)` for the CSV at `path`."""
+    if isinstance(backend, str):
+        backend = get_backend(backend, path)
+    return backend.run(path)
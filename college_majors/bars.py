@@ -0,0 +1,107 @@
+"""Grouped bar charts of any metrics per `Major_category` or `Major`, a page at a time.
+
+In[36]-In[40] build `major_categories` from two dicts of per-category means and
+plot `sharemen`/`sharewomen`. `group_metrics` builds the whole group x metric
+matrix, for any metrics and any aggregation, in one `groupby`;
+`grouped_bars` sorts it, cuts out one page of groups and draws the page with a
+single `DataFrame.plot.barh`, so no Python loop runs per group and views of
+all 173 majors stay legible.
+
+    python -m college_majors.bars --by Major --sort Low_wage_jobs --out bars
+"""
+
+import argparse
+import os
+
+from matplotlib.figure import Figure
+
+
+JOB_METRICS = ['Employed', 'Unemployed', 'College_jobs', 'Non_college_jobs', 'Low_wage_jobs']
+DEFAULT_PAGE_SIZE = 30
+
+# Figure height in inches: per bar, at least per group, plus room for the title and axis
+BAR_HEIGHT = 0.12
+MIN_GROUP_HEIGHT = 0.25
+MARGIN_HEIGHT = 1.5
+
+
+def group_metrics(recent_grads, metrics=JOB_METRICS, by='Major_category', agg='sum'):
+    """`by` x `metrics` frame of `agg` ('sum', 'mean', 'median', ...) over each group's rows."""
+    return recent_grads.groupby(by, observed=True, sort=False)[list(metrics)].agg(agg)
+
+
+def page_count(n_groups, page_size=DEFAULT_PAGE_SIZE):
+    return max(1, -(-n_groups // page_size))
+
+
+def sorted_page(table, sort_by=None, ascending=False, page=0, page_size=DEFAULT_PAGE_SIZE):
+    """Page `page` of `table`'s rows sorted by `sort_by` (default: the row total), largest first.
+
+    `sort_by` is a column of `table` or `'total'`; `page_size=None` keeps every row.
+    """
+    key = table.sum(axis=1) if sort_by in (None, 'total') else table[sort_by]
+    order = key.to_numpy().argsort(kind='stable')
+    if not ascending:
+        order = order[::-1]
+    if page_size is None:
+        return table.iloc[order]
+    if not 0 <= page < page_count(len(table), page_size):
+        raise ValueError("page {} out of range: {} groups make {} pages of {}".format(
+            page, len(table), page_count(len(table), page_size), page_size))
+    return table.iloc[order[page * page_size:(page + 1) * page_size]]
+
+
+def grouped_bars(recent_grads, metrics=JOB_METRICS, by='Major_category', agg='sum', sort_by=None, ascending=False,
+                 page=0, page_size=DEFAULT_PAGE_SIZE, stacked=False, table=None):
+    """Horizontal grouped (or `stacked`) bars of `metrics` for one page of `by` groups.
+
+    Pass the `group_metrics` result as `table` to draw several pages of it
+    without grouping again.
+    """
+    if table is None:
+        table = group_metrics(recent_grads, metrics, by, agg)
+    shown = sorted_page(table, sort_by, ascending, page, page_size)
+    bars = len(shown) * (1 if stacked else shown.shape[1])
+    fig = Figure(figsize=(10, MARGIN_HEIGHT + max(BAR_HEIGHT * bars, MIN_GROUP_HEIGHT * len(shown))))
+    ax = fig.add_subplot()
+    # barh draws bottom-up; reverse so the first group sits at the top
+    shown.iloc[::-1].plot.barh(ax=ax, stacked=stacked, width=0.8)
+    n_pages = page_count(len(table), page_size or len(table))
+    title = "{} per {}".format(agg, by) + (" (page {} of {})".format(page + 1, n_pages) if n_pages > 1 else "")
+    ax.set_title(title)
+    ax.set_ylabel(by)
+    fig.tight_layout()
+    return fig
+
+
+def main(argv=None):
+    from .render import load
+    parser = argparse.ArgumentParser(description="Grouped bar charts of job metrics per category or major.")
+    parser.add_argument('--source', default='recent-grads.csv')
+    parser.add_argument('--by', default='Major_category', choices=['Major_category', 'Major'])
+    parser.add_argument('--metric', dest='metrics', action='append',
+                        help="column to plot, may be repeated (default: {})".format(', '.join(JOB_METRICS)))
+    parser.add_argument('--agg', default='sum', help="sum, mean, median, ... (default: %(default)s)")
+    parser.add_argument('--sort', default='total', help="metric to order groups by (default: their total)")
+    parser.add_argument('--ascending', action='store_true')
+    parser.add_argument('--page', type=int, help="1-based page to draw (default: every page)")
+    parser.add_argument('--page-size', type=int, default=DEFAULT_PAGE_SIZE)
+    parser.add_argument('--stacked', action='store_true')
+    parser.add_argument('--out', default='bars', help="output directory (default: %(default)s)")
+    args = parser.parse_args(argv)
+
+    recent_grads, stats = load(args.source)
+    metrics = args.metrics or JOB_METRICS
+    table = group_metrics(recent_grads, metrics, args.by, args.agg)
+    pages = [args.page - 1] if args.page else range(page_count(len(table), args.page_size))
+    os.makedirs(args.out, exist_ok=True)
+    for page in pages:
+        fig = grouped_bars(recent_grads, metrics, args.by, args.agg, args.sort, args.ascending, page, args.page_size,
+                           args.stacked, table=table)
+        path = os.path.join(args.out, "{}-{}-page{}.png".format(args.by, args.agg, page + 1))
+        fig.savefig(path)
+        print(path)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,187 @@
+"""Run the load/clean/aggregate(/plot) pipeline over many CSV files at once.
+
+    python -m college_majors.batch 'snapshots/*.csv' data/ --out batch --jobs 8 --figures
+
+Accepts files, directories (every `*.csv` inside) and glob patterns, e.g. the
+FiveThirtyEight recent-grads, all-ages, grad-students and women-stem tables or
+per-year ACS snapshots. Each file is processed in its own worker: whatever of
+`majors`, `major_categories` and the figures its columns allow is written to
+`<out>/<dataset>/`, and one summary row per file goes into
+`<out>/comparison.csv`. A file's dataset name is its path relative to the
+inputs' common directory, so `2010/recent-grads.csv` and
+`2011/recent-grads.csv` become `2010__recent-grads` and `2011__recent-grads`.
+"""
+
+import argparse
+import glob
+import os
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from .aggregate import aggregate_major_categories, aggregate_majors
+from .load import clean
+
+
+# Sibling tables name some columns differently (grad-students.csv prefixes them with Grad_)
+COLUMN_ALIASES = {
+    'Total': ['Total', 'Grad_total'],
+    'Median': ['Median', 'Grad_median'],
+    'Employed': ['Employed', 'Grad_employed'],
+    'Unemployment_rate': ['Unemployment_rate', 'Grad_unemployment_rate'],
+    'Sample_size': ['Sample_size', 'Grad_sample_size'],
+}
+
+COMPARISON_FILE = 'comparison.csv'
+
+
+def find_sources(patterns):
+    """Sorted, de-duplicated CSV paths from files, directories and glob patterns."""
+    paths = []
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            paths.extend(glob.glob(os.path.join(pattern, '*.csv')))
+        else:
+            paths.extend(glob.glob(pattern) if glob.has_magic(pattern) else [pattern])
+    return sorted(set(os.path.abspath(p) for p in paths))
+
+
+def dataset_names(paths):
+    """Unique name per path: its path below the common directory, with `__` for separators."""
+    if not paths:
+        return []
+    root = os.path.commonpath([os.path.dirname(os.path.abspath(p)) for p in paths])
+    names = []
+    taken = set()
+    for path in paths:
+        base = os.path.splitext(os.path.relpath(os.path.abspath(path), root))[0].replace(os.sep, '__')
+        name, suffix = base, 2
+        while name in taken:
+            name, suffix = '{}-{}'.format(base, suffix), suffix + 1
+        taken.add(name)
+        names.append(name)
+    return names
+
+
+def harmonize(frame):
+    """Rename aliased columns to the recent-grads names, when the original is missing."""
+    renames = {}
+    for name, aliases in COLUMN_ALIASES.items():
+        if name not in frame:
+            for alias in aliases:
+                if alias in frame:
+                    renames[alias] = name
+                    break
+    return frame.rename(columns=renames)
+
+
+def _has(frame, *columns):
+    return all(c in frame for c in columns)
+
+
+def summarize(name, recent_grads, stats):
+    """One row of the comparison table for a cleaned frame."""
+    row = {'dataset': name,
+           'raw_rows': stats.raw_data_count,
+           'cleaned_rows': stats.cleaned_data_count,
+           'majors': recent_grads['Major'].nunique() if 'Major' in recent_grads else np.nan,
+           'major_categories': recent_grads['Major_category'].nunique() if 'Major_category' in recent_grads else np.nan}
+    if 'Total' in recent_grads:
+        row['total_grads'] = recent_grads['Total'].sum()
+    if 'Median' in recent_grads:
+        row['median_mean'] = recent_grads['Median'].mean()
+        row['median_median'] = recent_grads['Median'].median()
+        if 'Total' in recent_grads and recent_grads['Total'].sum() > 0:
+            row['median_weighted_mean'] = np.average(recent_grads['Median'], weights=recent_grads['Total'])
+    if 'ShareWomen' in recent_grads:
+        row['share_women_mean'] = recent_grads['ShareWomen'].mean()
+        row['predominantly_female'] = (recent_grads['ShareWomen'] >= 0.5).mean()
+    if 'Unemployment_rate' in recent_grads:
+        row['unemployment_rate_mean'] = recent_grads['Unemployment_rate'].mean()
+    return row
+
+
+def process(path, out_dir, figures=False, name=None):
+    """Pipeline for one file; returns its summary row (with `error` set on failure).
+
+    Outputs go to `out_dir/name`; `name` defaults to the file name without its extension.
+    """
+    if name is None:
+        name = os.path.splitext(os.path.basename(path))[0]
+    start = time.perf_counter()
+    try:
+        recent_grads, stats = clean(harmonize(pd.read_csv(path)))
+        target = os.path.join(out_dir, name)
+        os.makedirs(target, exist_ok=True)
+        if _has(recent_grads, 'Full_time', 'Total'):
+            recent_grads['ShareFull_time'] = recent_grads['Full_time'] / recent_grads['Total']
+        if 'ShareWomen' in recent_grads:
+            recent_grads['ShareMen'] = 1 - recent_grads['ShareWomen']
+
+        row = summarize(name, recent_grads, stats)
+        if _has(recent_grads, 'Major', 'Women', 'Men', 'Median'):
+            aggregate_majors(recent_grads).to_csv(os.path.join(target, 'majors.csv'))
+        if _has(recent_grads, 'Major_category', 'ShareWomen'):
+            aggregate_major_categories(recent_grads).to_csv(os.path.join(target, 'major_categories.csv'))
+        if figures:
+            row['figures'] = _render(recent_grads, target)
+        row['seconds'] = time.perf_counter() - start
+        return row
+    except Exception:
+        return {'dataset': name, 'error': traceback.format_exc(limit=1).strip().splitlines()[-1],
+                'seconds': time.perf_counter() - start}
+
+
+def _render(recent_grads, target):
+    # Only the figures whose columns this table has
+    import matplotlib
+    matplotlib.use('Agg')
+    from .plots import FIGURES
+    rendered = 0
+    for figure_name, draw in FIGURES.items():
+        try:
+            fig = draw(recent_grads)
+        except KeyError:
+            continue
+        fig.savefig(os.path.join(target, figure_name + '.png'), bbox_inches='tight')
+        rendered += 1
+    return rendered
+
+
+def run_batch(sources, out_dir, jobs=None, figures=False):
+    """Process every source in a worker pool and write the comparison table.
+
+    Returns the table, indexed by `dataset_names`, one row per source in input order.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    names = dataset_names(sources)
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        rows = list(pool.map(process, sources, [out_dir] * len(sources), [figures] * len(sources), names))
+    comparison = pd.DataFrame(rows).set_index('dataset')
+    comparison.to_csv(os.path.join(out_dir, COMPARISON_FILE))
+    return comparison
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the college majors pipeline over many CSV files.")
+    parser.add_argument('sources', nargs='+', help="CSV files, directories or glob patterns")
+    parser.add_argument('--out', default='batch', help="output directory (default: %(default)s)")
+    parser.add_argument('--jobs', type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument('--figures', action='store_true', help="also render the figures of every file")
+    args = parser.parse_args(argv)
+
+    sources = find_sources(args.sources)
+    if not sources:
+        parser.error("no CSV files match {}".format(' '.join(args.sources)))
+    start = time.perf_counter()
+    comparison = run_batch(sources, args.out, args.jobs, args.figures)
+    with pd.option_context('display.width', 200, 'display.max_columns', 20):
+        print(comparison)
+    print("Processed {} files in {:.2f}s".format(len(sources), time.perf_counter() - start))
+
+
+if __name__ == '__main__':
+    main()
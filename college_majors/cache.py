@@ -0,0 +1,120 @@
+"""Columnar cache of the cleaned and enriched `recent_grads` frame.
+
+The first run parses the CSV, drops nulls, adds `ShareFull_time`/`ShareMen` and
+writes the result as an uncompressed Arrow IPC (Feather v2) file named after
+the CSV's path and a hash of its contents, `SCHEMA` and `DERIVED_COLUMNS`. Later
+runs memory-map that file instead of parsing, and a changed CSV, or a change to
+how it is loaded, simply hashes to a new file, which triggers a rebuild.
+Same-named CSVs in different directories get separate cache files.
+
+Requires `pyarrow`.
+"""
+
+import hashlib
+import json
+import os
+import re
+
+from .load import DERIVED_COLUMNS, DEFAULT_CHUNKSIZE, SCHEMA, LoadStats, add_derived_columns, read_recent_grads
+
+
+DEFAULT_CACHE_DIR = '.cache'
+
+# Key under which the row counts are kept in the Arrow schema metadata
+_METADATA_KEY = b'college_majors'
+
+
+def _pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.feather
+    except ImportError:
+        raise ImportError("The recent_grads cache needs pyarrow: pip install pyarrow")
+    return pyarrow
+
+
+def source_hash(path, block_size=1 << 20):
+    """SHA-256 of the file contents, read in blocks."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _layout_hash():
+    # What the cached frame looks like besides the CSV: its dtypes and how the derived columns are computed
+    digest = hashlib.sha256(json.dumps(sorted(SCHEMA.items())).encode())
+    for name, compute in sorted(DERIVED_COLUMNS.items()):
+        digest.update(name.encode())
+        digest.update(compute.__code__.co_code)
+        digest.update(repr(compute.__code__.co_consts).encode())
+        digest.update(repr(compute.__code__.co_names).encode())
+    return digest.hexdigest()
+
+
+def _source_prefix(path):
+    # `<stem>-<hash of the absolute path>`: shared by every version of one CSV, and only by it
+    stem = os.path.splitext(os.path.basename(path))[0]
+    return "{}-{}".format(stem, hashlib.sha256(os.path.abspath(path).encode()).hexdigest()[:8])
+
+
+def cache_path(path, cache_dir=DEFAULT_CACHE_DIR, digest=None):
+    """Location of the cache file for the current contents of `path`."""
+    if digest is None:
+        digest = source_hash(path)
+    key = hashlib.sha256((digest + _layout_hash()).encode()).hexdigest()
+    return os.path.join(cache_dir, "{}-{}.feather".format(_source_prefix(path), key[:16]))
+
+
+def _write(recent_grads, stats, target):
+    pa = _pyarrow()
+    table = pa.Table.from_pandas(recent_grads, preserve_index=False)
+    metadata = dict(table.schema.metadata or {})
+    metadata[_METADATA_KEY] = json.dumps({'raw_data_count': stats.raw_data_count,
+                                          'cleaned_data_count': stats.cleaned_data_count}).encode()
+    table = table.replace_schema_metadata(metadata)
+    # Write under a temporary name so a crashed run never leaves a half-written cache behind
+    tmp = target + '.tmp'
+    pa.feather.write_feather(table, tmp, compression='uncompressed')
+    os.replace(tmp, target)
+
+
+def _read(target):
+    pa = _pyarrow()
+    # Uncompressed IPC + memory map: numeric columns are handed to pandas without copying
+    with pa.memory_map(target, 'r') as source:
+        table = pa.ipc.open_file(source).read_all()
+    counts = json.loads(table.schema.metadata[_METADATA_KEY])
+    stats = LoadStats()
+    stats.raw_data_count = counts['raw_data_count']
+    stats.cleaned_data_count = counts['cleaned_data_count']
+    return table.to_pandas(split_blocks=True), stats
+
+
+def _remove_stale(path, target):
+    # Drop caches of earlier versions of the same CSV, and only those: a plain prefix
+    # match on "recent-" would also take "recent-grads-<hash>.feather"
+    directory, name = os.path.split(target)
+    pattern = re.escape(_source_prefix(path)) + r'-[0-9a-f]{16}\.feather'
+    for other in os.listdir(directory):
+        if other != name and re.fullmatch(pattern, other):
+            os.remove(os.path.join(directory, other))
+
+
+def load_recent_grads(path='recent-grads.csv', cache_dir=DEFAULT_CACHE_DIR, chunksize=DEFAULT_CHUNKSIZE,
+                      refresh=False):
+    """Cleaned `recent_grads` with derived columns, plus its `LoadStats`.
+
+    Served from the cache when the CSV is unchanged; set `refresh` to force a rebuild.
+    """
+    target = cache_path(path, cache_dir)
+    if not refresh and os.path.exists(target):
+        return _read(target)
+
+    recent_grads, stats = read_recent_grads(path, chunksize)
+    add_derived_columns(recent_grads)
+    os.makedirs(cache_dir, exist_ok=True)
+    _write(recent_grads, stats, target)
+    _remove_stale(path, target)
+    return recent_grads, stats
@@ -0,0 +1,68 @@
+"""Compact in-memory `recent_grads`, for runs where many workers each hold a copy.
+
+`pd.read_csv` leaves `Major` and `Major_category` as strings and every number
+64 bits wide, and `add_derived_columns` adds two more float columns.
+`compact_frame` stores the string columns as categoricals, narrows each numeric
+column to the smallest dtype that still holds all of its values exactly, and
+drops the derived columns; `with_derived` recomputes those for the figures
+that plot them. No value changes, and the aggregations accumulate in float64
+either way, so every analysis result is identical to the wide frame's.
+"""
+
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+from .load import DERIVED_COLUMNS
+
+
+class MemoryReport(namedtuple('MemoryReport', ['before', 'after'])):
+    """Deep memory usage in bytes of a frame before and after `compact_frame`."""
+
+    def __str__(self):
+        saved = 1 - self.after / self.before if self.before else 0.0
+        return "Memory: {:.1f} KiB -> {:.1f} KiB ({:.0%} smaller)".format(self.before / 1024, self.after / 1024,
+                                                                          saved)
+
+
+def memory_usage(frame):
+    """Bytes held by `frame`, including the strings behind object and string columns."""
+    return int(frame.memory_usage(deep=True).sum())
+
+
+def _narrow(column):
+    dtype = column.dtype
+    if isinstance(dtype, pd.CategoricalDtype) or pd.api.types.is_bool_dtype(dtype):
+        return column
+    if pd.api.types.is_string_dtype(dtype) or dtype == object:
+        return column.astype('category')
+    if pd.api.types.is_integer_dtype(dtype):
+        return pd.to_numeric(column, downcast='integer')
+    if pd.api.types.is_float_dtype(dtype) and dtype != 'float32':
+        # float32 only when it round-trips; shares such as ShareWomen usually do not
+        narrow = column.astype('float32')
+        if np.array_equal(narrow.to_numpy(dtype='float64', na_value=np.nan),
+                          column.to_numpy(dtype='float64', na_value=np.nan), equal_nan=True):
+            return narrow
+    return column
+
+
+def compact_frame(recent_grads, drop_derived=True):
+    """Return `(compact, MemoryReport)`; `recent_grads` itself is left unchanged."""
+    before = memory_usage(recent_grads)
+    columns = [c for c in recent_grads.columns if not (drop_derived and c in DERIVED_COLUMNS)]
+    compact = pd.DataFrame(dict((c, _narrow(recent_grads[c])) for c in columns), index=recent_grads.index)
+    return compact, MemoryReport(before, memory_usage(compact))
+
+
+def with_derived(recent_grads, names=None):
+    """`recent_grads` with the derived columns in `names` (default: all) computed if missing.
+
+    The frame is returned as is when nothing is missing; otherwise the result
+    is a new frame sharing the existing columns.
+    """
+    missing = [n for n in (names or DERIVED_COLUMNS) if n not in recent_grads.columns]
+    if not missing:
+        return recent_grads
+    return recent_grads.assign(**dict((n, DERIVED_COLUMNS[n](recent_grads)) for n in missing))
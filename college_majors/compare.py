@@ -0,0 +1,52 @@
+"""Top-k vs. bottom-k comparisons (In[33]-In[35]).
+
+The notebook slices `recent_grads[:10]` and `recent_grads[-10:]`, which is only
+right while the frame is sorted by `Rank`, and glues them with the removed
+`DataFrame.append`. `top_bottom` finds both ends with `np.argpartition` in O(n),
+sorts only the 2k selected rows and gathers them with a single `take`.
+"""
+
+from collections import namedtuple
+
+import numpy as np
+
+
+TopBottom = namedtuple('TopBottom', ['frame', 'top_mean', 'bottom_mean'])
+TopBottom.__doc__ = """`frame` holds the top rows followed by the bottom rows; the means are of the metric(s)."""
+
+
+def top_bottom_positions(values, k, ascending=True):
+    """Positions of the `k` first and `k` last entries of `values` in sorted order.
+
+    With `ascending=True` the "top" entries are the smallest values (Rank 1 first).
+    """
+    values = np.asarray(values)
+    if not ascending:
+        values = -values
+    n = len(values)
+    k = min(k, n)
+    if k == 0:
+        empty = np.empty(0, dtype='intp')
+        return empty, empty
+    if k == n:
+        order = np.argsort(values, kind='stable')
+        return order, order
+    top = np.argpartition(values, k - 1)[:k]
+    bottom = np.argpartition(values, n - k)[n - k:]
+    # Only the 2k selected positions are sorted
+    top = top[np.argsort(values[top], kind='stable')]
+    bottom = bottom[np.argsort(values[bottom], kind='stable')]
+    return top, bottom
+
+
+def top_bottom(recent_grads, metric, k=10, by='Rank', ascending=True):
+    """Compare `metric` between the `k` best and `k` worst rows ranked by `by`.
+
+    `metric` may be a column name or a list of them. With the defaults this is
+    the first ten and last ten rows of the Rank-ordered notebook frame, whatever
+    order `recent_grads` is actually in.
+    """
+    top, bottom = top_bottom_positions(recent_grads[by].to_numpy(), k, ascending)
+    frame = recent_grads.take(np.concatenate([top, bottom]))
+    values = frame[metric]
+    return TopBottom(frame, values.iloc[:len(top)].mean(), values.iloc[len(top):].mean())
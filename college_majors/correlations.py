@@ -0,0 +1,177 @@
+"""Pearson/Spearman correlations with bootstrap intervals for every column pair.
+
+The notebook reads relationships such as Median vs. Sample_size or
+Unemployment_rate vs. ShareWomen off scatter plots (In[9]-In[23], In[43]).
+`correlation_report` puts a number and a confidence interval on all of them:
+both coefficient matrices come from one centred matrix product, and the
+bootstrap represents a whole batch of resamples as a `(batch, rows)` matrix of
+row weights, so the sums behind every resample's correlation matrix come from
+one matrix product. Batches run on a thread pool; NumPy releases the GIL inside
+the product, so they use all cores.
+
+    python -m college_majors.correlations --bootstrap 2000
+"""
+
+import argparse
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from .load import numeric_columns
+
+
+DEFAULT_BOOTSTRAP = 1000
+DEFAULT_CONFIDENCE = 0.95
+
+# Upper bound on the size of the arrays one bootstrap batch works on at a time
+BATCH_BYTES = 64 << 20
+
+# From this many rows on, resample weights are Poisson(1) instead of multinomial
+POISSON_MIN_ROWS = 20000
+
+
+def _corr(values):
+    """Correlation matrix of the columns of `values`, or of each `(rows, columns)` slab of a 3D array."""
+    centered = values - values.mean(axis=-2, keepdims=True)
+    cov = np.swapaxes(centered, -1, -2) @ centered
+    scale = np.sqrt(np.diagonal(cov, axis1=-2, axis2=-1))
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return cov / (scale[..., :, None] * scale[..., None, :])
+
+
+def _ranks(values):
+    # Average ranks per column, as Spearman's coefficient needs
+    return pd.DataFrame(values).rank(method='average').to_numpy()
+
+
+def correlation_matrices(values):
+    """`(pearson, spearman)` matrices of the columns of a 2D array without NaNs."""
+    return _corr(values), _corr(_ranks(values))
+
+
+def _weighted_corr(s0, s1, s2, p, pairs):
+    # Correlation matrices from weighted sums: s1 of every column, s2 of every column pair
+    mean = s1 / s0[:, None]
+    cov_pairs = s2 / s0[:, None] - mean[:, pairs[0]] * mean[:, pairs[1]]
+    cov = np.zeros((len(s0), p, p))
+    cov[:, pairs[0], pairs[1]] = cov_pairs
+    cov[:, pairs[1], pairs[0]] = cov_pairs
+    scale = np.sqrt(np.diagonal(cov, axis1=1, axis2=2))
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return cov / (scale[:, :, None] * scale[:, None, :])
+
+
+def _bootstrap_batch(values, pairs, size, seed, poisson):
+    """`size` bootstrap correlation matrices of the columns of `values`.
+
+    Each resample is a vector of row weights (how often each row is drawn), so
+    all the resamples' sums come from one matrix product per block of rows:
+    `weights (size x rows) @ [x_i, x_i * x_j] (rows x terms)`. Weights are
+    multinomial (classic bootstrap) or, for large inputs, independent
+    Poisson(1) counts, which can be drawn block by block.
+    """
+    rng = np.random.default_rng(seed)
+    n, p = values.shape
+    terms = p + len(pairs[0])
+    rows_per_block = int(max(1, BATCH_BYTES // (8 * (size + terms))))
+    if not poisson:
+        counts = rng.multinomial(n, np.full(n, 1.0 / n), size=size).astype('float64')
+
+    s0 = np.zeros(size)
+    sums = np.zeros((size, terms))
+    for start in range(0, n, rows_per_block):
+        block = values[start:start + rows_per_block]
+        if poisson:
+            weights = rng.poisson(1.0, (size, len(block))).astype('float64')
+        else:
+            weights = counts[:, start:start + rows_per_block]
+        s0 += weights.sum(axis=1)
+        sums += weights @ np.hstack([block, block[:, pairs[0]] * block[:, pairs[1]]])
+    return _weighted_corr(s0, sums[:, :p], sums[:, p:], p, pairs)
+
+
+def bootstrap(values, n_boot=DEFAULT_BOOTSTRAP, seed=0, jobs=None):
+    """Bootstrap distributions of both matrices: arrays of shape `(n_boot, columns, columns)`.
+
+    Spearman resamples use the ranks of the full sample, the usual shortcut that
+    avoids re-ranking every resample. Inputs of `POISSON_MIN_ROWS` rows or more
+    use the Poisson bootstrap.
+    """
+    n, p = values.shape
+    # Pearson and Spearman share the resampled rows, so both go through one stacked
+    # array, centred first to keep the sums of products well conditioned
+    stacked = np.hstack([values, _ranks(values)])
+    stacked = stacked - stacked.mean(axis=0)
+    # Only pairs within the Pearson block and within the Spearman block are needed
+    upper = np.triu_indices(p)
+    pairs = (np.concatenate([upper[0], upper[0] + p]), np.concatenate([upper[1], upper[1] + p]))
+    poisson = n >= POISSON_MIN_ROWS
+    batch = int(max(1, min(n_boot, -(-n_boot // (jobs or os.cpu_count() or 1)))))
+    if not poisson:
+        # A multinomial batch draws its whole (size, rows) count matrix up front, as
+        # int64 and then float64; keep that within BATCH_BYTES too
+        batch = int(max(1, min(batch, BATCH_BYTES // (16 * max(n, 1)))))
+    sizes = [min(batch, n_boot - start) for start in range(0, n_boot, batch)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    with ThreadPoolExecutor(max_workers=jobs or os.cpu_count()) as pool:
+        results = list(pool.map(_bootstrap_batch, [stacked] * len(sizes), [pairs] * len(sizes), sizes, seeds,
+                                 [poisson] * len(sizes)))
+    matrices = np.concatenate(results) if results else np.empty((0, 2 * p, 2 * p))
+    return matrices[:, :p, :p], matrices[:, p:, p:]
+
+
+def correlation_report(recent_grads, columns=None, n_boot=DEFAULT_BOOTSTRAP, confidence=DEFAULT_CONFIDENCE,
+                       seed=0, jobs=None):
+    """One row per column pair, ranked by the strength of the Spearman correlation.
+
+    Rows with a missing value in any of `columns` (default: every numeric
+    column) are left out, as `dropna()` does in In[7].
+    """
+    if columns is None:
+        columns = numeric_columns(recent_grads)
+    values = recent_grads[columns].to_numpy(dtype='float64', na_value=np.nan)
+    values = values[~np.isnan(values).any(axis=1)]
+    pearson, spearman = correlation_matrices(values)
+
+    i, j = np.triu_indices(len(columns), k=1)
+    report = pd.DataFrame({'x': np.asarray(columns)[i], 'y': np.asarray(columns)[j], 'n': len(values),
+                           'pearson': pearson[i, j], 'spearman': spearman[i, j]})
+    if n_boot:
+        boot_pearson, boot_spearman = bootstrap(values, n_boot, seed, jobs)
+        tail = (1 - confidence) / 2 * 100
+        for name, boot in [('pearson', boot_pearson), ('spearman', boot_spearman)]:
+            low, high = np.nanpercentile(boot[:, i, j], [tail, 100 - tail], axis=0)
+            report[name + '_low'] = low
+            report[name + '_high'] = high
+        # An interval that excludes zero marks a relationship worth reporting
+        report['significant'] = (report['spearman_low'] > 0) | (report['spearman_high'] < 0)
+
+    order = np.argsort(-np.abs(report['spearman'].to_numpy()), kind='stable')
+    return report.iloc[order].reset_index(drop=True)
+
+
+def main(argv=None):
+    from .load import add_derived_columns, read_recent_grads
+    parser = argparse.ArgumentParser(description="Rank the correlations between the numeric columns.")
+    parser.add_argument('--source', default='recent-grads.csv')
+    parser.add_argument('--bootstrap', type=int, default=DEFAULT_BOOTSTRAP, help="resamples (0 to skip)")
+    parser.add_argument('--confidence', type=float, default=DEFAULT_CONFIDENCE)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--jobs', type=int, default=None)
+    parser.add_argument('--output', help="write the table to this CSV file")
+    args = parser.parse_args(argv)
+
+    recent_grads, _ = read_recent_grads(args.source)
+    add_derived_columns(recent_grads)
+    report = correlation_report(recent_grads, n_boot=args.bootstrap, confidence=args.confidence,
+                                seed=args.seed, jobs=args.jobs)
+    if args.output:
+        report.to_csv(args.output, index=False)
+    with pd.option_context('display.width', 200, 'display.max_rows', None):
+        print(report)
+
+
+if __name__ == '__main__':
+    main()
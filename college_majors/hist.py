@@ -0,0 +1,121 @@
+"""Precomputed histograms for the distribution panels (In[24]-In[29]).
+
+In[24] bins eight columns and In[25], In[27] and In[29] bin ShareWomen, ShareMen
+and Median again. A `HistogramIndex` bins every requested column of a frame in
+one vectorized pass and keeps the edges and counts, so the plots and the
+"predominantly female/male" fractions (In[26], In[28]) read stored counts.
+"""
+
+import weakref
+from collections import namedtuple
+
+import numpy as np
+
+from .profiling import profiler
+
+
+Histogram = namedtuple('Histogram', ['counts', 'edges'])
+
+# Default bin count of `Series.plot(kind='hist')`
+DEFAULT_BINS = 10
+
+
+def _column_ranges(values, range):
+    if range is not None:
+        lo = np.full(values.shape[1], float(range[0]))
+        hi = np.full(values.shape[1], float(range[1]))
+    else:
+        with np.errstate(invalid='ignore'):
+            lo = np.nanmin(values, axis=0)
+            hi = np.nanmax(values, axis=0)
+    # Same conventions as np.histogram for empty and constant columns
+    lo = np.where(np.isnan(lo), 0.0, lo)
+    hi = np.where(np.isnan(hi), 1.0, hi)
+    same = lo == hi
+    return np.where(same, lo - 0.5, lo), np.where(same, hi + 0.5, hi)
+
+
+def histograms(values, bins=DEFAULT_BINS, range=None):
+    """Histogram every column of the 2D array `values` at once.
+
+    Returns `(counts, edges)` of shapes `(columns, bins)` and `(columns, bins + 1)`,
+    equal to calling `np.histogram(column, bins, range)` on each non-NaN column.
+    """
+    values = np.asarray(values, dtype='float64')
+    n_rows, n_cols = values.shape
+    lo, hi = _column_ranges(values, range)
+    edges = np.linspace(lo, hi, bins + 1, axis=1)
+
+    valid = np.isfinite(values) & (values >= lo) & (values <= hi)
+    with np.errstate(invalid='ignore'):
+        idx = ((values - lo) * (bins / (hi - lo))).astype('intp', copy=False)
+    idx = np.clip(np.where(valid, idx, 0), 0, bins - 1)
+    # Round-off corrections, as in np.histogram, so values on an edge land in the same bin
+    col = np.broadcast_to(np.arange(n_cols), values.shape)
+    idx -= valid & (values < edges[col, idx])
+    idx += valid & (values >= edges[col, idx + 1]) & (idx != bins - 1)
+
+    flat = (col * bins + idx)[valid]
+    counts = np.bincount(flat, minlength=n_cols * bins).reshape(n_cols, bins)
+    return counts, edges
+
+
+class HistogramIndex:
+    """Edges and counts of the columns of one frame, keyed by `(column, bins, range)`."""
+
+    def __init__(self, frame):
+        self.frame = frame
+        self.n_rows = len(frame)
+        self._entries = {}
+
+    def compute(self, columns, bins=DEFAULT_BINS, range=None):
+        """Bin all of `columns` that are not stored yet in a single pass."""
+        if range is not None:
+            range = (float(range[0]), float(range[1]))
+        missing = [c for c in columns if (c, bins, range) not in self._entries]
+        if missing:
+            with profiler.stage('histograms', rows=self.n_rows):
+                counts, edges = histograms(self.frame[missing].to_numpy(dtype='float64', na_value=np.nan), bins,
+                                           range)
+            for i, column in enumerate(missing):
+                self._entries[(column, bins, range)] = Histogram(counts[i], edges[i])
+        return [self._entries[(c, bins, range)] for c in columns]
+
+    def get(self, column, bins=DEFAULT_BINS, range=None):
+        """`Histogram(counts, edges)` of `column`, computed on first use."""
+        return self.compute([column], bins, range)[0]
+
+    def fraction_in_bin(self, column, bin, bins=DEFAULT_BINS, range=None):
+        """Fraction of all rows that fall in bin number `bin` of `column`."""
+        return self.get(column, bins, range).counts[bin] / self.n_rows
+
+    def clear(self):
+        self._entries.clear()
+
+
+# One index per live frame, so every figure drawn from the same frame shares it
+_indexes = {}
+
+
+def histogram_index(frame):
+    """Shared `HistogramIndex` of `frame`, created on first use.
+
+    Call `.clear()` on it after modifying the frame's columns in place.
+    """
+    key = id(frame)
+    entry = _indexes.get(key)
+    if entry is not None and entry[0]() is frame:
+        return entry[1]
+    # The index only holds a proxy, so the registry does not keep the frame alive
+    index = HistogramIndex(weakref.proxy(frame))
+    _indexes[key] = (weakref.ref(frame), index)
+    weakref.finalize(frame, _indexes.pop, key, None)
+    return index
+
+
+def predominant_fraction(recent_grads, share='ShareWomen'):
+    """Fraction of majors where `share` is at least one half (In[26], In[28]).
+
+    Read off the upper bar of the two-bin (0, 1) histogram drawn in In[25]/In[27].
+    """
+    return histogram_index(recent_grads).fraction_in_bin(share, 1, bins=2, range=(0, 1))
@@ -0,0 +1,153 @@
+"""Loading and cleaning `recent-grads.csv` (In[2]-In[8]) in bounded memory.
+
+`pd.read_csv` followed by `dropna()` holds the raw frame and its cleaned copy at
+the same time, with 64-bit columns throughout. The readers below parse the file
+in chunks against an explicit schema, drop null rows chunk by chunk and keep
+only the narrow cleaned columns.
+"""
+
+import numpy as np
+import pandas as pd
+
+from .aggregate import IncrementalAggregates
+from .profiling import profiler
+
+
+# Column dtypes of recent-grads.csv once the null rows are gone
+COUNT_COLUMNS = ['Rank', 'Major_code', 'Total', 'Men', 'Women', 'Sample_size', 'Employed', 'Full_time',
+                 'Part_time', 'Full_time_year_round', 'Unemployed', 'Median', 'P25th', 'P75th',
+                 'College_jobs', 'Non_college_jobs', 'Low_wage_jobs']
+RATE_COLUMNS = ['ShareWomen', 'Unemployment_rate']
+CATEGORY_COLUMNS = ['Major', 'Major_category']
+
+# Identifier columns that are numeric but meaningless to plot or correlate
+ID_COLUMNS = ['Rank', 'Major_code']
+
+SCHEMA = dict([(c, 'int32') for c in COUNT_COLUMNS] +
+              [(c, 'float32') for c in RATE_COLUMNS] +
+              [(c, 'category') for c in CATEGORY_COLUMNS])
+
+# Dtypes used while parsing, since a row may still contain gaps. Counts go through
+# float64, which the C parser fills directly; nullable Int32 parses far slower, and
+# `_check_integral` keeps the float64 route as strict as it was.
+_PARSE_DTYPES = {'int32': 'float64', 'float32': 'float32', 'category': 'category'}
+
+DEFAULT_CHUNKSIZE = 100000
+
+# Columns the notebook computes from others: In[22] and In[27]
+DERIVED_COLUMNS = {
+    'ShareFull_time': lambda frame: frame['Full_time'] / frame['Total'],
+    'ShareMen': lambda frame: 1 - frame['ShareWomen'],
+}
+
+
+class LoadStats:
+    """Row counts before and after dropping nulls (In[6] and In[8])."""
+
+    def __init__(self):
+        self.raw_data_count = 0
+        self.cleaned_data_count = 0
+
+    @property
+    def dropped_count(self):
+        return self.raw_data_count - self.cleaned_data_count
+
+    def __str__(self):
+        return ("Initial no. of rows = " + str(self.raw_data_count) + "\n" +
+                "No. of rows after cleaning = " + str(self.cleaned_data_count))
+
+    def __repr__(self):
+        return "LoadStats(raw_data_count={}, cleaned_data_count={})".format(self.raw_data_count,
+                                                                           self.cleaned_data_count)
+
+
+def _check_integral(chunk, dtypes):
+    # A float64 -> int32 cast would truncate 12.7 and wrap 3e9 around without a word
+    for column, dtype in dtypes.items():
+        if not pd.api.types.is_integer_dtype(pd.api.types.pandas_dtype(dtype)):
+            continue
+        values = chunk[column].to_numpy()
+        info = np.iinfo(dtype)
+        bad = (values != np.floor(values)) | (values < info.min) | (values > info.max)
+        if bad.any():
+            # read_csv numbers the rows of every chunk on from the previous one
+            row = chunk.index[np.flatnonzero(bad)[0]]
+            raise ValueError("Column {!r} holds {} in data row {}, which is not a whole number in {} range".format(
+                column, values[bad][0], row + 1, dtype))
+
+
+def iter_recent_grads(path='recent-grads.csv', chunksize=DEFAULT_CHUNKSIZE, stats=None, schema=SCHEMA):
+    """Yield cleaned chunks of `path`, typed according to `schema`.
+
+    Pass a `LoadStats` as `stats` to collect the raw and cleaned row counts.
+    Raises ValueError when a count is fractional or does not fit its dtype.
+    """
+    with open(path, 'rb') as f:
+        header = pd.read_csv(f, nrows=0).columns
+    parse_dtypes = dict((c, _PARSE_DTYPES[schema[c]]) for c in header if c in schema)
+    final_dtypes = dict((c, schema[c]) for c in header if c in schema)
+
+    for chunk in pd.read_csv(path, dtype=parse_dtypes, chunksize=chunksize):
+        raw_count = chunk.shape[0]
+        chunk = chunk.dropna()
+        _check_integral(chunk, final_dtypes)
+        if stats is not None:
+            stats.raw_data_count += raw_count
+            stats.cleaned_data_count += chunk.shape[0]
+        yield chunk.astype(final_dtypes)
+
+
+def read_recent_grads(path='recent-grads.csv', chunksize=DEFAULT_CHUNKSIZE, schema=SCHEMA):
+    """Return the cleaned frame and its `LoadStats`, built chunk by chunk."""
+    stats = LoadStats()
+    with profiler.stage('read_recent_grads') as stage:
+        chunks = list(iter_recent_grads(path, chunksize, stats, schema))
+        stage.rows = stats.raw_data_count
+    if not chunks:
+        return pd.DataFrame(columns=list(schema)), stats
+    # Categories differ from chunk to chunk; union them so the result stays categorical
+    recent_grads = pd.concat(chunks, ignore_index=True)
+    for column in CATEGORY_COLUMNS:
+        if column in recent_grads and recent_grads[column].dtype != 'category':
+            recent_grads[column] = recent_grads[column].astype('category')
+    return recent_grads, stats
+
+
+def clean(recent_grads):
+    """Drop rows with missing values (In[7]); returns the cleaned frame and its `LoadStats`."""
+    stats = LoadStats()
+    stats.raw_data_count = recent_grads.shape[0]
+    with profiler.stage('dropna', rows=stats.raw_data_count):
+        recent_grads = recent_grads.dropna()
+    stats.cleaned_data_count = recent_grads.shape[0]
+    return recent_grads, stats
+
+
+def stream_aggregate(path='recent-grads.csv', chunksize=DEFAULT_CHUNKSIZE, schema=SCHEMA):
+    """Build `majors` and `major_categories` without holding the whole file.
+
+    Only one chunk and the per-group partial sums are in memory at any time.
+    Returns `(majors, major_categories, stats)`.
+    """
+    stats = LoadStats()
+    aggregates = IncrementalAggregates()
+    with profiler.stage('stream_aggregate') as stage:
+        for chunk in iter_recent_grads(path, chunksize, stats, schema):
+            aggregates.update(chunk)
+        stage.rows = stats.raw_data_count
+    if aggregates.row_count == 0:
+        raise ValueError("No rows left in {} after dropping nulls".format(path))
+    return aggregates.majors(), aggregates.major_categories(), stats
+
+
+def add_derived_columns(recent_grads):
+    """Add `ShareFull_time` (In[22]) and `ShareMen` (In[27]) in place and return the frame."""
+    with profiler.stage('add_derived_columns', rows=len(recent_grads)):
+        for name, compute in DERIVED_COLUMNS.items():
+            recent_grads[name] = compute(recent_grads)
+    return recent_grads
+
+
+def numeric_columns(frame):
+    """Numeric columns of `frame`, without the identifier columns."""
+    return [c for c in frame.select_dtypes('number').columns if c not in ID_COLUMNS]
@@ -0,0 +1,129 @@
+"""Scatter matrix that draws each column pair once (In[31]/In[32]).
+
+`pandas.plotting.scatter_matrix` builds the full N x N grid and plots both
+triangles. `scatter_matrix` here draws the lower triangle plus the diagonal
+histograms on shared axes, takes the diagonal from the frame's
+`HistogramIndex`, and above `max_points` rows draws every panel as a 2D
+histogram assembled from per-column bin codes computed once. It also reports
+how long each panel took to build and to draw, so it can be run over every
+numeric column. Both times also go to the profiler as `panel(<y>,<x>)` stages,
+under whatever stage builds the figure or saves it.
+"""
+
+import time
+
+import numpy as np
+import pandas as pd
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+from .hist import histogram_index
+from .load import numeric_columns
+from .profiling import profiler
+
+
+MATRIX_MAX_POINTS = 5000
+MATRIX_BINS = 60
+
+
+def _bin_codes(values, bins):
+    # Bin index of every value within its column's range; -1 for NaN
+    finite = values[np.isfinite(values)]
+    lo, hi = (finite.min(), finite.max()) if len(finite) else (0.0, 1.0)
+    if lo == hi:
+        lo, hi = lo - 0.5, hi + 0.5
+    codes = np.floor((values - lo) * (bins / (hi - lo)))
+    codes = np.clip(np.nan_to_num(codes, nan=-1, posinf=-1, neginf=-1), -1, bins - 1).astype('intp')
+    return codes, (lo, hi)
+
+
+def _time_draws(ax, panel, draw_seconds, position):
+    # Time every later draw of `ax`, e.g. by `savefig`, into the profiler and `draw_seconds`
+    draw = ax.draw
+
+    def timed_draw(renderer, *args, **kwargs):
+        with profiler.stage(panel):
+            start = time.perf_counter()
+            try:
+                return draw(renderer, *args, **kwargs)
+            finally:
+                draw_seconds[position] += time.perf_counter() - start
+    ax.draw = timed_draw
+
+
+def scatter_matrix(data, columns=None, figsize=None, max_points=MATRIX_MAX_POINTS, bins=MATRIX_BINS,
+                   marker_size=4, draw=True):
+    """Lower-triangle scatter matrix of `columns` (default: all numeric columns).
+
+    Returns `(fig, timings)`; `timings` has one row per panel with the column
+    pair, how it was drawn ('hist', 'scatter' or 'binned'), the seconds spent
+    creating its artists (`build_seconds`) and rendering them (`draw_seconds`).
+    With `draw=False` the figure is not rendered here and `draw_seconds` is
+    NaN; the panels' draw times then reach only the profiler, when the figure
+    is saved.
+    """
+    if columns is None:
+        columns = numeric_columns(data)
+    n = len(columns)
+    if figsize is None:
+        figsize = (max(10, 1.6 * n), max(10, 1.6 * n))
+    fig = Figure(figsize=figsize)
+    grid = fig.add_gridspec(n, n, hspace=0.05, wspace=0.05)
+
+    values = data[columns].to_numpy(dtype='float64', na_value=np.nan)
+    dense = len(data) > max_points
+    if dense:
+        # Binned once per column, then reused by every panel in its row and column
+        binned = [_bin_codes(values[:, j], bins) for j in range(n)]
+
+    histograms = histogram_index(data).compute(columns)
+    timings = []
+    draw_seconds = np.zeros(n * (n + 1) // 2)
+    diagonal = [None] * n
+    row_axes = [None] * n
+    for i in range(n):
+        for j in range(i + 1):
+            panel = 'panel({},{})'.format(columns[i], columns[j])
+            with profiler.stage(panel, rows=len(data)):
+                start = time.perf_counter()
+                if i == j:
+                    ax = fig.add_subplot(grid[i, j])
+                    ax.hist(histograms[i].edges[:-1], bins=histograms[i].edges, weights=histograms[i].counts,
+                            edgecolor='white')
+                    diagonal[i] = ax
+                    kind = 'hist'
+                else:
+                    ax = fig.add_subplot(grid[i, j], sharex=diagonal[j], sharey=row_axes[i])
+                    if dense:
+                        (cx, x_range), (cy, y_range) = binned[j], binned[i]
+                        valid = (cx >= 0) & (cy >= 0)
+                        counts = np.bincount(cy[valid] * bins + cx[valid], minlength=bins * bins).reshape(bins, bins)
+                        ax.imshow(np.ma.masked_equal(counts, 0), origin='lower', aspect='auto', cmap='Blues',
+                                  interpolation='nearest', extent=(x_range[0], x_range[1], y_range[0], y_range[1]))
+                        kind = 'binned'
+                    else:
+                        ax.scatter(values[:, j], values[:, i], s=marker_size, alpha=0.5)
+                        kind = 'scatter'
+                    if row_axes[i] is None:
+                        row_axes[i] = ax
+                timings.append((columns[i], columns[j], kind, time.perf_counter() - start))
+            _time_draws(ax, panel, draw_seconds, len(timings) - 1)
+
+            # Labels only on the outer edge, as pandas does
+            if i == n - 1:
+                ax.set_xlabel(columns[j])
+                ax.tick_params(axis='x', labelrotation=90)
+            else:
+                ax.tick_params(axis='x', labelbottom=False)
+            if j == 0 and i > 0:
+                ax.set_ylabel(columns[i])
+            else:
+                ax.tick_params(axis='y', labelleft=False)
+
+    timings = pd.DataFrame(timings, columns=['y', 'x', 'kind', 'build_seconds'])
+    if draw:
+        FigureCanvasAgg(fig).draw()
+        timings['draw_seconds'] = draw_seconds
+    else:
+        timings['draw_seconds'] = np.nan
+    return fig, timings
@@ -0,0 +1,120 @@
+"""Weighted salary percentiles per `Major_category` (or any grouping) and overall.
+
+`median_sal` in In[16] is the unweighted mean of per-major medians, which
+counts a major of 200 graduates as much as one of 200,000. Here each major's
+salary distribution is modelled as a piecewise-linear CDF through
+(P25th, 0.25), (Median, 0.5) and (P75th, 0.75), with the outer quarters spread
+over the same widths as the inner ones. A group's distribution is the mixture
+of its majors' CDFs, weighted by `Full_time_year_round` (by default, or
+`Total`), and its P25/median/P75 are where that mixture crosses 0.25/0.5/0.75.
+For a group holding a single major this returns that major's own three
+columns.
+
+All groups are handled in one pass: the mixture CDF is piecewise linear, so a
+single sort of every major's knots by (group, salary) and a few cumulative sums
+give its value at each knot, and one `np.searchsorted` plus a linear
+interpolation solves it for every (group, quantile) pair.
+"""
+
+import numpy as np
+import pandas as pd
+
+
+QUANTILES = (0.25, 0.5, 0.75)
+SALARY_COLUMNS = ['P25th', 'Median', 'P75th']
+
+
+def _knots(percentiles):
+    # (n, 5) salaries at CDF 0, .25, .5, .75 and 1: the outer segments repeat the inner widths
+    p25, median, p75 = np.sort(percentiles, axis=1).T
+    return np.stack([p25 - (median - p25), p25, median, p75, p75 + (p75 - median)], axis=1)
+
+
+def mixture_quantiles(percentiles, weights, codes, n_groups, q=QUANTILES):
+    """Quantiles `q` of each group's weighted mixture of piecewise-linear CDFs.
+
+    `percentiles` is an `(n, 3)` array of every member's P25/median/P75,
+    `weights` its weight and `codes` its group (0..n_groups-1). Returns an
+    `(n_groups, len(q))` array, NaN for groups without positive weight.
+    """
+    percentiles = np.asarray(percentiles, dtype='float64').reshape(-1, 3)
+    weights = np.asarray(weights, dtype='float64')
+    codes = np.asarray(codes, dtype='intp')
+    keep = np.isfinite(percentiles).all(axis=1) & np.isfinite(weights) & (weights > 0) & (codes >= 0)
+    percentiles, weights, codes = percentiles[keep], weights[keep], codes[keep]
+
+    # Each of the four segments carries a quarter of the weight, spread evenly
+    # over its width or, for a zero-width segment, as a point mass at its knot
+    knots = _knots(percentiles)
+    widths = np.diff(knots, axis=1)
+    mass = np.repeat(weights[:, None] / 4, 4, axis=1)
+    flat = widths > 0
+    slope = np.where(flat, mass / np.where(flat, widths, 1), 0.0)
+    # One event where each segment starts (slope up, or a jump) and one where it ends (slope down)
+    x = np.concatenate([knots[:, :4], knots[:, 1:]], axis=1).ravel()
+    dslope = np.concatenate([slope, -slope], axis=1).ravel()
+    jump = np.concatenate([np.where(flat, 0.0, mass), np.zeros_like(mass)], axis=1).ravel()
+    event_codes = np.repeat(codes, 8)
+
+    # Sorted by salary, then stably by group (a radix sort on narrow codes): cheaper than
+    # a lexsort, and the order of tied salaries does not change the mixture
+    order = np.argsort(x)
+    order = order[np.argsort(event_codes[order].astype(np.min_scalar_type(n_groups)), kind='stable')]
+    x, dslope, jump, event_codes = x[order], dslope[order], jump[order], event_codes[order]
+    totals = np.bincount(codes, weights=weights, minlength=n_groups)
+    sizes = np.bincount(event_codes, minlength=n_groups)
+    starts = np.cumsum(sizes) - sizes
+    first = np.zeros(len(x), dtype=bool)
+    first[starts[sizes > 0]] = True
+
+    # Slope of the mixture just after each event, and the weight it adds since the previous one;
+    # slopes are summed per group so round-off does not carry over between groups
+    running = np.cumsum(dslope)
+    slope_after = np.maximum(running - (running - dslope)[starts[event_codes]], 0.0)
+    area = np.zeros(len(x))
+    area[1:] = slope_after[:-1] * np.diff(x)
+    area[first] = 0.0
+    cumulative = np.cumsum(area + jump)
+
+    # Total weight before each group, so targets are absolute positions in `cumulative`
+    before = np.concatenate([[0.0], np.cumsum(totals)[:-1]])
+    q = np.asarray(q, dtype='float64')
+    targets = before[:, None] + totals[:, None] * q[None, :]
+    # Guard against round-off pushing a target just past the group's last event
+    positions = np.searchsorted(cumulative, targets - 1e-9 * totals[:, None], side='left')
+    positions = np.clip(positions, starts[:, None], np.maximum(starts + sizes - 1, 0)[:, None])
+    if not len(x):
+        return np.full(targets.shape, np.nan)
+
+    # Between the previous event and this one the mixture rises linearly; past that, it jumps here
+    previous = np.maximum(positions - 1, 0)
+    rise = targets - cumulative[previous]
+    linear = ~first[positions] & (slope_after[previous] > 0) & (rise <= area[positions])
+    with np.errstate(invalid='ignore', divide='ignore'):
+        result = np.where(linear, x[previous] + rise / slope_after[previous], x[positions])
+    result[sizes == 0] = np.nan
+    return result
+
+
+def salary_percentiles(recent_grads, by='Major_category', weight='Full_time_year_round'):
+    """Weighted P25th/Median/P75th per `by` group (overall when `by` is None).
+
+    The result also carries each group's total `weight` and number of majors,
+    and is sorted by `Median`, highest first.
+    """
+    n = len(recent_grads)
+    if by is None:
+        codes, index = np.zeros(n, dtype='intp'), pd.Index(['All majors'])
+    else:
+        codes, uniques = pd.factorize(np.asarray(recent_grads[by]), sort=False)
+        index = pd.Index(uniques, name=by)
+
+    quantiles = mixture_quantiles(recent_grads[SALARY_COLUMNS].to_numpy(dtype='float64', na_value=np.nan),
+                                  recent_grads[weight].to_numpy(dtype='float64', na_value=np.nan), codes, len(index))
+
+    result = pd.DataFrame(quantiles, index=index, columns=SALARY_COLUMNS)
+    valid = codes >= 0
+    group_weights = np.nan_to_num(recent_grads[weight].to_numpy(dtype='float64', na_value=np.nan))
+    result[weight] = np.bincount(codes[valid], weights=group_weights[valid], minlength=len(index))
+    result['majors'] = np.bincount(codes[valid], minlength=len(index))
+    return result.sort_values('Median', ascending=False)
@@ -0,0 +1,281 @@
+"""The notebook's figures as functions of the cleaned `recent_grads` frame.
+
+Each function draws on a fresh `matplotlib.figure.Figure` instead of the pyplot
+state machine, so figures can be rendered headless and side by side. `FIGURES`
+lists them in notebook order, keyed by the name used for the output file.
+"""
+
+import numpy as np
+from matplotlib.figure import Figure
+
+from .aggregate import aggregate_major_categories, aggregate_majors
+from .bars import grouped_bars
+from .compare import top_bottom
+from .hist import histogram_index
+from .matrix import scatter_matrix
+from .percentiles import salary_percentiles
+
+
+def _figure(figsize=None):
+    fig = Figure(figsize=figsize)
+    return fig, fig.add_subplot()
+
+
+# Above this many rows `scatter` stops drawing one marker per row
+SCATTER_MAX_POINTS = 20000
+SCATTER_BINS = 200
+
+
+def _binned_scatter(ax, x, y, bins, xlim, ylim):
+    # One raster image of the 2D histogram: the artist count and the size of a
+    # saved SVG no longer depend on the number of rows
+    finite = np.isfinite(x) & np.isfinite(y)
+    x, y = x[finite], y[finite]
+    x_range = xlim if xlim is not None else (x.min(), x.max())
+    y_range = ylim if ylim is not None else (y.min(), y.max())
+    counts, x_edges, y_edges = np.histogram2d(x, y, bins=bins, range=[x_range, y_range])
+    image = ax.imshow(np.ma.masked_equal(counts.T, 0), origin='lower', aspect='auto', interpolation='nearest',
+                      extent=(x_edges[0], x_edges[-1], y_edges[0], y_edges[-1]), cmap='Blues')
+    ax.figure.colorbar(image, ax=ax, label='count')
+
+
+def scatter(data, x, y, title, figsize=None, xlim=None, ylim=None, max_points=SCATTER_MAX_POINTS,
+            dense='bin', bins=SCATTER_BINS, seed=0):
+    """Scatter plot of `y` against `x` that stays cheap on large frames.
+
+    Up to `max_points` rows this is `DataFrame.plot(kind='scatter')`. Beyond it,
+    `dense='bin'` draws a 2D histogram with `bins` bins per axis and
+    `dense='sample'` plots a random sample of `max_points` rows.
+    """
+    fig, ax = _figure(figsize)
+    if len(data) <= max_points:
+        data.plot(x=x, y=y, kind='scatter', title=title, ax=ax)
+    elif dense == 'bin':
+        _binned_scatter(ax, data[x].to_numpy(dtype='float64'), data[y].to_numpy(dtype='float64'), bins, xlim, ylim)
+        ax.set_title(title)
+        ax.set_xlabel(x)
+        ax.set_ylabel(y)
+    elif dense == 'sample':
+        data.sample(n=max_points, random_state=seed).plot(x=x, y=y, kind='scatter', title=title, ax=ax, s=4)
+    else:
+        raise ValueError("dense must be 'bin' or 'sample', not {!r}".format(dense))
+    if xlim is not None:
+        ax.set_xlim(*xlim)
+    if ylim is not None:
+        ax.set_ylim(*ylim)
+    return fig
+
+
+def median_vs_sample_size(recent_grads):
+    # In[9]
+    return scatter(recent_grads, 'Sample_size', 'Median', 'Median vs. Sample_size')
+
+
+def unemployment_rate_vs_sample_size(recent_grads):
+    # In[10]
+    return scatter(recent_grads, 'Sample_size', 'Unemployment_rate', 'Unemployment_rate vs. Sample_size')
+
+
+def median_vs_full_time(recent_grads):
+    # In[11]
+    return scatter(recent_grads, 'Full_time', 'Median', 'Median vs. Full_time')
+
+
+def unemployment_rate_vs_sharewomen(recent_grads):
+    # In[12]
+    return scatter(recent_grads, 'ShareWomen', 'Unemployment_rate', 'Unemployment_rate vs. ShareWomen')
+
+
+def median_vs_men(recent_grads):
+    # In[13]
+    return scatter(recent_grads, 'Men', 'Median', 'Median vs. Men')
+
+
+def median_sal_vs_total_grads(recent_grads):
+    # In[19]
+    majors = aggregate_majors(recent_grads)
+    return scatter(majors, 'total_grads', 'median_sal', 'median_sal vs. total_grads')
+
+
+def median_vs_sharewomen(recent_grads):
+    # In[20]
+    return scatter(recent_grads, 'ShareWomen', 'Median', 'Median vs. ShareWomen')
+
+
+def median_vs_sharewomen_zoomed(recent_grads):
+    # In[21]
+    return scatter(recent_grads, 'ShareWomen', 'Median', 'Median vs. ShareWomen', figsize=(4, 4),
+                    xlim=(0, 1), ylim=(20000, 80000))
+
+
+def median_vs_sharefull_time(recent_grads):
+    # In[22]
+    return scatter(recent_grads, 'ShareFull_time', 'Median', 'Median vs. ShareFull_Time')
+
+
+def median_vs_sharefull_time_zoomed(recent_grads):
+    # In[23]
+    return scatter(recent_grads, 'ShareFull_time', 'Median', 'Median vs. ShareFull_Time', figsize=(5, 5),
+                    xlim=(0.4, 1.0), ylim=(0, 80000))
+
+
+HIST_COLUMNS = ['Sample_size', 'Median', 'Employed', 'Full_time', 'ShareWomen', 'Unemployment_rate', 'Men', 'Women']
+
+
+def _draw_histogram(ax, histogram, **kwargs):
+    # One bar per stored bin; the frame itself is not rescanned
+    ax.hist(histogram.edges[:-1], bins=histogram.edges, weights=histogram.counts, **kwargs)
+
+
+def column_histograms(recent_grads, cols=HIST_COLUMNS):
+    # In[24]
+    fig = Figure(figsize=(5, 6 * len(cols)))
+    for r, histogram in enumerate(histogram_index(recent_grads).compute(cols)):
+        ax = fig.add_subplot(len(cols), 1, r + 1)
+        _draw_histogram(ax, histogram)
+        ax.tick_params(axis='x', labelrotation=30)
+        ax.set_ylabel('Frequency')
+        ax.set_title(cols[r])
+    return fig
+
+
+def _share_histogram(recent_grads, col):
+    fig, ax = _figure()
+    _draw_histogram(ax, histogram_index(recent_grads).get(col, bins=2, range=(0, 1)))
+    ax.set_title(col)
+    ax.set_xlabel(col)
+    ax.set_ylabel('Number of Majors')
+    return fig
+
+
+def sharewomen_histogram(recent_grads):
+    # In[25]
+    return _share_histogram(recent_grads, 'ShareWomen')
+
+
+def sharemen_histogram(recent_grads):
+    # In[27]
+    return _share_histogram(recent_grads, 'ShareMen')
+
+
+def median_histogram(recent_grads):
+    # In[29]
+    fig, ax = _figure()
+    _draw_histogram(ax, histogram_index(recent_grads).get('Median'))
+    ax.set_xlabel("Median")
+    ax.set_ylabel("Number of majors")
+    ax.set_title("Median")
+    return fig
+
+
+def _scatter_matrix(recent_grads, cols):
+    # Not drawn here: the panels' build and draw times reach the profiler through
+    # the render stages, as panel(<y>,<x>) under draw and save
+    fig, _ = scatter_matrix(recent_grads, cols, figsize=(10, 10), draw=False)
+    return fig
+
+
+def sample_size_median_matrix(recent_grads):
+    # In[31]
+    return _scatter_matrix(recent_grads, ['Sample_size', 'Median'])
+
+
+def sample_size_median_unemployment_matrix(recent_grads):
+    # In[32]
+    return _scatter_matrix(recent_grads, ['Sample_size', 'Median', 'Unemployment_rate'])
+
+
+def numeric_columns_matrix(recent_grads):
+    # In[31]/In[32] opened up to every numeric column
+    fig, _ = scatter_matrix(recent_grads, draw=False)
+    return fig
+
+
+def _top_bottom_bar(recent_grads, col):
+    fig, ax = _figure()
+    top_bottom(recent_grads, col, k=10).frame.plot.bar(y=col, ax=ax)
+    return fig
+
+
+def top_bottom_sharewomen(recent_grads):
+    # In[33]
+    return _top_bottom_bar(recent_grads, 'ShareWomen')
+
+
+def top_bottom_unemployment_rate(recent_grads):
+    # In[35]
+    return _top_bottom_bar(recent_grads, 'Unemployment_rate')
+
+
+def category_shares(recent_grads):
+    # In[40]
+    major_categories = aggregate_major_categories(recent_grads)
+    fig, ax = _figure(figsize=(8, 6))
+    major_categories[['sharemen', 'sharewomen']].plot.barh(ax=ax)
+    return fig
+
+
+def category_salaries(recent_grads):
+    # Weighted P25/median/P75 per category, next to the In[40] category view
+    salaries = salary_percentiles(recent_grads).iloc[::-1]
+    fig, ax = _figure(figsize=(8, 6))
+    errors = [salaries['Median'] - salaries['P25th'], salaries['P75th'] - salaries['Median']]
+    salaries['Median'].plot.barh(xerr=errors, capsize=3, ax=ax)
+    ax.set_xlabel('Median salary (bars: P25th to P75th)')
+    ax.set_title('Salary by Major_category, weighted by Full_time_year_round')
+    return fig
+
+
+def category_jobs(recent_grads):
+    # The In[40] category view for the job counts
+    return grouped_bars(recent_grads)
+
+
+def median_box(recent_grads):
+    # In[41]
+    fig, ax = _figure()
+    recent_grads['Median'].plot(kind='box', ax=ax)
+    return fig
+
+
+def unemployment_rate_box(recent_grads):
+    # In[42]
+    fig, ax = _figure()
+    recent_grads['Unemployment_rate'].plot(kind='box', ax=ax)
+    return fig
+
+
+def unemployment_rate_vs_sharewomen_hexbin(recent_grads):
+    # In[43]
+    fig, ax = _figure()
+    recent_grads.plot.hexbin(x='ShareWomen', y='Unemployment_rate', ax=ax)
+    return fig
+
+
+FIGURES = dict([
+    ('median_vs_sample_size', median_vs_sample_size),
+    ('unemployment_rate_vs_sample_size', unemployment_rate_vs_sample_size),
+    ('median_vs_full_time', median_vs_full_time),
+    ('unemployment_rate_vs_sharewomen', unemployment_rate_vs_sharewomen),
+    ('median_vs_men', median_vs_men),
+    ('median_sal_vs_total_grads', median_sal_vs_total_grads),
+    ('median_vs_sharewomen', median_vs_sharewomen),
+    ('median_vs_sharewomen_zoomed', median_vs_sharewomen_zoomed),
+    ('median_vs_sharefull_time', median_vs_sharefull_time),
+    ('median_vs_sharefull_time_zoomed', median_vs_sharefull_time_zoomed),
+    ('column_histograms', column_histograms),
+    ('sharewomen_histogram', sharewomen_histogram),
+    ('sharemen_histogram', sharemen_histogram),
+    ('median_histogram', median_histogram),
+    ('sample_size_median_matrix', sample_size_median_matrix),
+    ('sample_size_median_unemployment_matrix', sample_size_median_unemployment_matrix),
+    ('numeric_columns_matrix', numeric_columns_matrix),
+    ('top_bottom_sharewomen', top_bottom_sharewomen),
+    ('top_bottom_unemployment_rate', top_bottom_unemployment_rate),
+    ('category_shares', category_shares),
+    ('category_salaries', category_salaries),
+    ('category_jobs', category_jobs),
+    ('median_box', median_box),
+    ('unemployment_rate_box', unemployment_rate_box),
+    ('unemployment_rate_vs_sharewomen_hexbin', unemployment_rate_vs_sharewomen_hexbin),
+])
@@ -0,0 +1,158 @@
+"""Stage-level timing of the pipeline: wall time, CPU time, peak RSS and row counts.
+
+    profiler = Profiler(enabled=True)
+    with profiler.stage('load', rows=len(frame)):
+        ...
+    profiler.write_json('profile.json')
+    profiler.write_collapsed('profile.folded')   # flamegraph.pl / speedscope input
+
+Stages nest, per thread; each record keeps its full path
+(`render;column_histograms`). CPU time is that of the stage's own thread, so a
+stage waiting on another thread shows none, and neither does work handed to
+other threads or processes (e.g. by a multi-threaded Polars plan). The OS only reports the process's lifetime peak
+RSS, so a record holds that value at the end of the stage
+(`process_peak_rss_bytes`) and how much the stage raised it
+(`peak_rss_growth_bytes`); a stage that stays below an earlier peak shows no
+growth however much it allocates, and stages running in parallel threads
+share both numbers.
+A disabled profiler hands out one shared no-op context manager, so leaving the
+hooks in production code costs a method call and an attribute check.
+
+The module-level `profiler` is what the package's own stages report to; it is
+off unless the `COLLEGE_MAJORS_PROFILE` environment variable is set.
+"""
+
+import functools
+import json
+import os
+import sys
+import threading
+import time
+
+try:
+    import resource
+except ImportError:
+    # Not available on Windows; peak RSS is then reported as None
+    resource = None
+
+
+def peak_rss():
+    """Peak resident set size of this process since it started, in bytes, or None when unknown."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+class _NullStage:
+    rows = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_STAGE = _NullStage()
+
+
+class _Stage:
+    def __init__(self, profiler, name, rows):
+        self.profiler = profiler
+        self.name = name
+        self.rows = rows
+
+    def __enter__(self):
+        stack = self.profiler._stack
+        stack.append(self.name)
+        self.path = ';'.join(stack)
+        self.peak = peak_rss()
+        self.wall = time.perf_counter()
+        self.cpu = time.thread_time()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        wall = time.perf_counter() - self.wall
+        cpu = time.thread_time() - self.cpu
+        self.profiler._stack.pop()
+        peak = peak_rss()
+        self.profiler.records.append({'stage': self.path, 'wall_seconds': wall, 'cpu_seconds': cpu,
+                                      'process_peak_rss_bytes': peak,
+                                      'peak_rss_growth_bytes': None if peak is None else peak - self.peak,
+                                      'rows': self.rows,
+                                      'error': None if exc_type is None else exc_type.__name__})
+        return False
+
+
+class Profiler:
+    """Collects one record per finished stage while `enabled`."""
+
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self.records = []
+        # Each thread nests its own stages
+        self._local = threading.local()
+
+    @property
+    def _stack(self):
+        stack = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def stage(self, name, rows=None):
+        """Context manager timing the enclosed block; set `.rows` on it to record a row count later."""
+        if not self.enabled:
+            return _NULL_STAGE
+        return _Stage(self, name, rows)
+
+    def profiled(self, name=None):
+        """Decorator form of `stage`, named after the function by default."""
+        def decorate(func):
+            stage_name = name or func.__name__
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return func(*args, **kwargs)
+                with self.stage(stage_name):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorate
+
+    def reset(self):
+        self.records = []
+
+    def report(self):
+        """JSON-serializable report: every record plus totals per stage path."""
+        totals = {}
+        for record in self.records:
+            total = totals.setdefault(record['stage'], {'calls': 0, 'wall_seconds': 0.0, 'cpu_seconds': 0.0})
+            total['calls'] += 1
+            total['wall_seconds'] += record['wall_seconds']
+            total['cpu_seconds'] += record['cpu_seconds']
+        return {'records': self.records, 'totals': totals, 'process_peak_rss_bytes': peak_rss()}
+
+    def write_json(self, path):
+        with open(path, 'w') as f:
+            json.dump(self.report(), f, indent=2)
+
+    def collapsed(self):
+        """Folded-stack lines (`a;b;c <microseconds>`) of self time, for flame graphs."""
+        totals = self.report()['totals']
+        lines = []
+        for path, total in totals.items():
+            # Self time: the stage's wall time minus that of its direct children
+            children = sum(t['wall_seconds'] for p, t in totals.items()
+                           if p.startswith(path + ';') and ';' not in p[len(path) + 1:])
+            lines.append('{} {}'.format(path, max(0, int(round((total['wall_seconds'] - children) * 1e6)))))
+        return lines
+
+    def write_collapsed(self, path):
+        with open(path, 'w') as f:
+            f.write('\n'.join(self.collapsed()) + '\n')
+
+
+profiler = Profiler(enabled=bool(os.environ.get('COLLEGE_MAJORS_PROFILE')))
@@ -0,0 +1,128 @@
+"""Memoized dashboard queries over `recent_grads`, `majors` and `major_categories`.
+
+Every answer is cached under the query, its arguments and the dataset version,
+in an LRU cache with an optional time-to-live. Loading a different version of
+the data empties the cache. Cached frames are shared between callers and must
+be treated as read-only.
+"""
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from .aggregate import aggregate_major_categories, aggregate_majors
+from .compare import top_bottom
+from .hist import histogram_index, predominant_fraction
+
+
+class QueryCache:
+    """Thread-safe LRU cache with an optional TTL and hit/miss counters."""
+
+    def __init__(self, maxsize=256, ttl=None, clock=time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, compute):
+        """Cached value of `key`, calling `compute()` on a miss or after expiry."""
+        now = self.clock()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and (self.ttl is None or now - entry[1] < self.ttl):
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
+        # Computed outside the lock so slow queries do not serialize the fast ones
+        value = compute()
+        with self._lock:
+            self._entries[key] = (value, now)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'size': len(self._entries)}
+
+
+def dataset_version(recent_grads):
+    """Content hash of a frame, for when the source file's hash is not at hand."""
+    digest = hashlib.sha256()
+    digest.update(pd.util.hash_pandas_object(pd.Index(recent_grads.columns)).to_numpy().tobytes())
+    digest.update(pd.util.hash_pandas_object(recent_grads, index=False).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+class Queries:
+    """The dashboard's questions about one version of `recent_grads`.
+
+    `version` identifies the data, e.g. `cache.source_hash` of the CSV; it
+    defaults to a content hash of the frame.
+    """
+
+    def __init__(self, recent_grads, version=None, maxsize=256, ttl=None, clock=time.monotonic):
+        self.cache = QueryCache(maxsize, ttl, clock)
+        self.recent_grads = None
+        self.version = None
+        self.set_data(recent_grads, version)
+
+    def set_data(self, recent_grads, version=None):
+        """Switch to new data; the cache is emptied when the version changes.
+
+        So are the frame's shared histograms, which are keyed by the frame
+        object and would otherwise outlive an in-place edit.
+        """
+        if version is None:
+            version = dataset_version(recent_grads)
+        if version != self.version:
+            self.cache.clear()
+            histogram_index(recent_grads).clear()
+        self.recent_grads = recent_grads
+        self.version = version
+
+    def _cached(self, name, args, compute):
+        return self.cache.get((self.version, name) + args, compute)
+
+    def majors(self):
+        """The `majors` frame (In[18])."""
+        return self._cached('majors', (), lambda: aggregate_majors(self.recent_grads))
+
+    def major_categories(self):
+        """The `major_categories` frame (In[39])."""
+        return self._cached('major_categories', (), lambda: aggregate_major_categories(self.recent_grads))
+
+    def median_vs_total(self, category=None):
+        """`total_grads` and `median_sal` per major, optionally within one `Major_category`."""
+        def compute():
+            majors = self.majors()[['total_grads', 'median_sal']]
+            if category is None:
+                return majors
+            in_category = self.recent_grads.loc[self.recent_grads['Major_category'] == category, 'Major']
+            return majors[majors.index.isin(np.asarray(in_category))]
+        return self._cached('median_vs_total', (category,), compute)
+
+    def top_share_women(self, n=10):
+        """`TopBottom` of `ShareWomen` for the `n` highest- and lowest-ranked majors (In[33]/In[34])."""
+        return self._cached('top_share_women', (n,), lambda: top_bottom(self.recent_grads, 'ShareWomen', k=n))
+
+    def predominant_fraction(self, share='ShareWomen'):
+        """Fraction of majors that are predominantly female, or male with `share='ShareMen'` (In[26])."""
+        return self._cached('predominant_fraction', (share,), lambda: predominant_fraction(self.recent_grads, share))
+
+    def stats(self):
+        """Cache hit/miss counters and size."""
+        return self.cache.stats()
@@ -0,0 +1,342 @@
+"""Asyncio service that picks up new versions of recent-grads-style CSVs and applies only what changed.
+
+    python -m college_majors.refresh shared/snapshots --interval 60 --out figures
+    python -m college_majors.refresh http://localhost:8000/ --once
+
+The source is a local directory (every `*.csv` in it) or an HTTP server that
+lists its CSV files, such as `python -m http.server` or a JSON array of names.
+Each poll asks the source for a version key per file (modification time and
+size, or `ETag`/`Last-Modified`), downloads the new or changed files
+concurrently and compares each with the version loaded before, row by row,
+keyed by `Major`:
+
+* the `majors` and `major_categories` aggregations are redone only for the
+  majors and categories whose rows changed, by patching their partial sums;
+* a figure is redrawn only when a column it plots changed, or rows were
+  added or removed (`report.FIGURE_COLUMNS` lists what each figure reads).
+
+A file whose contents did not change therefore costs a download and a diff.
+"""
+
+import argparse
+import asyncio
+import glob
+import json
+import os
+import re
+import shutil
+import sys
+import urllib.request
+from collections import namedtuple
+from urllib.parse import urljoin
+
+import numpy as np
+import pandas as pd
+
+from .aggregate import category_partials, finalize_major_categories, finalize_majors, major_partials
+from .load import add_derived_columns, read_recent_grads
+from .report import FIGURE_COLUMNS
+
+
+Version = namedtuple('Version', ['name', 'key', 'location'])
+
+RowDiff = namedtuple('RowDiff', ['added', 'removed', 'changed', 'columns'])
+RowDiff.__doc__ = """Majors `added`, `removed` and `changed` (an Index each) and the names of the changed `columns`."""
+
+RefreshResult = namedtuple('RefreshResult', ['name', 'version', 'diff', 'majors', 'major_categories',
+                                             'aggregations', 'figures'])
+RefreshResult.__doc__ = """One applied version: its diff, the current aggregations and what was recomputed."""
+
+# Columns read by each aggregation
+AGGREGATION_COLUMNS = {
+    'majors': ['Major', 'Men', 'Women', 'Median'],
+    'major_categories': ['Major_category', 'ShareWomen', 'ShareMen'],
+}
+
+
+class DirectorySource:
+    """The `pattern` files of a local (or mounted) directory."""
+
+    def __init__(self, path, pattern='*.csv'):
+        self.path = path
+        self.pattern = pattern
+
+    def __str__(self):
+        return os.path.join(self.path, self.pattern)
+
+    def _scan(self):
+        versions = []
+        for path in sorted(glob.glob(os.path.join(self.path, self.pattern))):
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                # Deleted since the glob; gone from this poll's listing too
+                continue
+            versions.append(Version(os.path.basename(path), '{}-{}'.format(stat.st_mtime_ns, stat.st_size), path))
+        return versions
+
+    async def versions(self):
+        return await asyncio.to_thread(self._scan)
+
+    async def fetch(self, version, dest):
+        await asyncio.to_thread(shutil.copyfile, version.location, dest)
+
+
+class HttpSource:
+    """CSV files listed at `url`, as an HTML index page or a JSON array of names."""
+
+    def __init__(self, url, timeout=30):
+        self.url = url if url.endswith('/') else url + '/'
+        self.timeout = timeout
+
+    def __str__(self):
+        return self.url
+
+    def _list(self):
+        with urllib.request.urlopen(self.url, timeout=self.timeout) as response:
+            body = response.read().decode('utf-8', 'replace')
+            if 'json' in response.headers.get('Content-Type', ''):
+                names = json.loads(body)
+            else:
+                names = re.findall(r'href="([^"?#]+\.csv)"', body, flags=re.IGNORECASE)
+        return sorted(set(urljoin(self.url, n) for n in names))
+
+    def _head(self, url):
+        request = urllib.request.Request(url, method='HEAD')
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            headers = response.headers
+            return headers.get('ETag') or '{}-{}'.format(headers.get('Last-Modified'), headers.get('Content-Length'))
+
+    def _download(self, url, dest):
+        with urllib.request.urlopen(url, timeout=self.timeout) as response, open(dest, 'wb') as f:
+            shutil.copyfileobj(response, f)
+
+    async def versions(self):
+        urls = await asyncio.to_thread(self._list)
+        keys = await asyncio.gather(*[asyncio.to_thread(self._head, url) for url in urls], return_exceptions=True)
+        versions = []
+        for url, key in zip(urls, keys):
+            if isinstance(key, Exception):
+                # Left out of this poll, so it is tried again on the next one
+                print("Skipping {}: {}: {}".format(url, type(key).__name__, key), file=sys.stderr)
+                continue
+            versions.append(Version(url.rsplit('/', 1)[-1], key, url))
+        return versions
+
+    async def fetch(self, version, dest):
+        await asyncio.to_thread(self._download, version.location, dest)
+
+
+def source_from(spec):
+    """`HttpSource` for an http(s) URL, `DirectorySource` otherwise."""
+    if spec.startswith(('http://', 'https://')):
+        return HttpSource(spec)
+    return DirectorySource(spec)
+
+
+def _column_changed(old, new):
+    if pd.api.types.is_numeric_dtype(old.dtype) and pd.api.types.is_numeric_dtype(new.dtype):
+        a = old.to_numpy(dtype='float64', na_value=np.nan)
+        b = new.to_numpy(dtype='float64', na_value=np.nan)
+        return (a != b) & ~(np.isnan(a) & np.isnan(b))
+    # Categoricals of two files have different categories; compare the labels
+    a = np.asarray(old, dtype=object)
+    b = np.asarray(new, dtype=object)
+    return (a != b) & ~(pd.isna(a) & pd.isna(b))
+
+
+def diff_frames(old, new, key='Major'):
+    """`RowDiff` of two frames with one row per `key`; `old=None` counts every row as added."""
+    new_keys = pd.Index(np.asarray(new[key]))
+    if old is None:
+        return RowDiff(new_keys, pd.Index([]), pd.Index([]), sorted(new.columns))
+    old_keys = pd.Index(np.asarray(old[key]))
+    if not (old_keys.is_unique and new_keys.is_unique):
+        raise ValueError("Cannot diff by {!r}: it has duplicate values".format(key))
+    common = old_keys.intersection(new_keys, sort=False)
+    old_rows = old.iloc[old_keys.get_indexer(common)]
+    new_rows = new.iloc[new_keys.get_indexer(common)]
+    columns = [c for c in new.columns if c in old.columns and c != key]
+    changed = np.zeros(len(common), dtype=bool)
+    changed_columns = set(c for c in new.columns.symmetric_difference(old.columns))
+    for column in columns:
+        mask = _column_changed(old_rows[column], new_rows[column])
+        if mask.any():
+            changed |= mask
+            changed_columns.add(column)
+    return RowDiff(new_keys.difference(old_keys, sort=False), old_keys.difference(new_keys, sort=False),
+                   common[changed], sorted(changed_columns))
+
+
+def affected_figures(diff):
+    """Figures to redraw after `diff`: all of them when rows came or went, else those plotting a changed column."""
+    from .plots import FIGURES
+    if len(diff.added) or len(diff.removed):
+        return list(FIGURES)
+    changed = set(diff.columns)
+    # A figure missing from FIGURE_COLUMNS may read any column
+    return [name for name in FIGURES if changed.intersection(FIGURE_COLUMNS.get(name) or changed)]
+
+
+def _patch(partials, fresh, stale, order):
+    # Drop the stale groups, add their recomputed sums and restore first-appearance order
+    kept = partials.drop(stale, errors='ignore')
+    return pd.concat([kept, fresh]).reindex(order)
+
+
+class Dataset:
+    """The loaded version of one source file and its partial aggregations."""
+
+    def __init__(self, frame, version):
+        self.frame = frame
+        self.version = version
+        self.major_partials = major_partials(frame)
+        self.category_partials = category_partials(frame)
+
+    def update(self, frame, version, diff):
+        """Switch to `frame`, recomputing only the groups `diff` touches; returns the updated aggregations."""
+        changed = set(diff.columns)
+        touched = diff.added.append(diff.removed).append(diff.changed)
+        updated = []
+        if len(diff.added) or len(diff.removed) or changed.intersection(AGGREGATION_COLUMNS['majors']):
+            rows = frame[np.isin(np.asarray(frame['Major']), np.asarray(touched))]
+            self.major_partials = _patch(self.major_partials, major_partials(rows), touched,
+                                         pd.unique(np.asarray(frame['Major'])))
+            updated.append('majors')
+        if len(diff.added) or len(diff.removed) or changed.intersection(AGGREGATION_COLUMNS['major_categories']):
+            # A changed major affects the categories it left and joined
+            old_majors = np.asarray(self.frame['Major'])
+            new_majors = np.asarray(frame['Major'])
+            categories = pd.Index(np.concatenate([
+                np.asarray(self.frame['Major_category'])[np.isin(old_majors, np.asarray(touched))],
+                np.asarray(frame['Major_category'])[np.isin(new_majors, np.asarray(touched))]])).unique()
+            rows = frame[np.isin(np.asarray(frame['Major_category']), np.asarray(categories))]
+            self.category_partials = _patch(self.category_partials, category_partials(rows), categories,
+                                            pd.unique(np.asarray(frame['Major_category'])))
+            updated.append('major_categories')
+        self.frame = frame
+        self.version = version
+        return updated
+
+    def majors(self):
+        return finalize_majors(self.major_partials)
+
+    def major_categories(self):
+        return finalize_major_categories(self.category_partials)
+
+
+def _report(result):
+    diff = result.diff
+    columns = ', '.join(diff.columns) if len(diff.columns) <= 6 else '{} columns'.format(len(diff.columns))
+    print("{} ({}): +{} -{} ~{} majors; changed: {}; recomputed: {}; redrawn: {} figures".format(
+        result.name, result.version.key, len(diff.added), len(diff.removed), len(diff.changed),
+        columns or '-', ', '.join(result.aggregations) or '-', len(result.figures)))
+
+
+class RefreshService:
+    """Polls `source` and applies every new version of its files.
+
+    Downloads go to `work_dir`, at most `concurrency` at a time. With
+    `out_dir`, the affected figures of `<name>.csv` are rendered to
+    `out_dir/<name>/`. `on_refresh` receives a `RefreshResult` per applied
+    version (default: print a one-line summary). A file that fails to download
+    or load is reported on stderr and retried on the next poll; so, in `run`,
+    is a poll that cannot list the source at all.
+    """
+
+    def __init__(self, source, work_dir='.refresh', out_dir=None, concurrency=4, interval=60, on_refresh=_report,
+                 jobs=None):
+        self.source = source
+        self.work_dir = work_dir
+        self.out_dir = out_dir
+        self.concurrency = concurrency
+        self.interval = interval
+        self.on_refresh = on_refresh
+        self.jobs = jobs
+        self.datasets = {}
+        self._seen = {}
+
+    async def _download(self, version, semaphore):
+        async with semaphore:
+            dest = os.path.join(self.work_dir, version.name)
+            await self.source.fetch(version, dest + '.part')
+            os.replace(dest + '.part', dest)
+            return dest
+
+    def _apply(self, version, path):
+        frame, stats = read_recent_grads(path)
+        add_derived_columns(frame)
+        dataset = self.datasets.get(version.name)
+        diff = diff_frames(dataset.frame if dataset else None, frame)
+        if dataset is None:
+            dataset = self.datasets[version.name] = Dataset(frame, version)
+            aggregations = list(AGGREGATION_COLUMNS)
+        else:
+            aggregations = dataset.update(frame, version, diff)
+        figures = affected_figures(diff)
+        if self.out_dir and figures:
+            from .render import render_all
+            render_all(frame, os.path.join(self.out_dir, os.path.splitext(version.name)[0]), figures,
+                       jobs=self.jobs)
+        return RefreshResult(version.name, version, diff, dataset.majors(), dataset.major_categories(),
+                             aggregations, figures)
+
+    async def _refresh(self, version, semaphore):
+        try:
+            path = await self._download(version, semaphore)
+            result = await asyncio.to_thread(self._apply, version, path)
+        except Exception as error:
+            print("Skipping {}: {}: {}".format(version.name, type(error).__name__, error), file=sys.stderr)
+            return None
+        self._seen[version.name] = version.key
+        if self.on_refresh is not None:
+            self.on_refresh(result)
+        return result
+
+    async def poll(self):
+        """Fetch and apply every new version once; returns their `RefreshResult`s."""
+        os.makedirs(self.work_dir, exist_ok=True)
+        versions = await self.source.versions()
+        pending = [v for v in versions if self._seen.get(v.name) != v.key]
+        semaphore = asyncio.Semaphore(self.concurrency)
+        results = await asyncio.gather(*[self._refresh(v, semaphore) for v in pending])
+        return [r for r in results if r is not None]
+
+    async def run(self, stop=None):
+        """Poll every `interval` seconds until the `asyncio.Event` `stop` is set."""
+        stop = stop or asyncio.Event()
+        while not stop.is_set():
+            try:
+                await self.poll()
+            except Exception as error:
+                print("Poll of {} failed: {}: {}".format(self.source, type(error).__name__, error), file=sys.stderr)
+            try:
+                await asyncio.wait_for(stop.wait(), self.interval)
+            except asyncio.TimeoutError:
+                pass
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Watch a directory or HTTP server for new recent-grads CSVs.")
+    parser.add_argument('source', help="directory, or http(s) URL of a file listing")
+    parser.add_argument('--interval', type=float, default=60, help="seconds between polls")
+    parser.add_argument('--concurrency', type=int, default=4, help="simultaneous downloads")
+    parser.add_argument('--work-dir', default='.refresh', help="where downloads are kept")
+    parser.add_argument('--out', help="render the affected figures under this directory")
+    parser.add_argument('--jobs', type=int, default=None, help="worker processes for the figures")
+    parser.add_argument('--once', action='store_true', help="poll once and exit")
+    args = parser.parse_args(argv)
+
+    if args.out:
+        import matplotlib
+        matplotlib.use('Agg')
+    service = RefreshService(source_from(args.source), args.work_dir, args.out, args.concurrency, args.interval,
+                             jobs=args.jobs)
+    try:
+        asyncio.run(service.poll() if args.once else service.run())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,138 @@
+"""Render every notebook figure to image files, without IPython or a display.
+
+    python -m college_majors.render --out figures --format png --format svg
+
+Figures are spread across a process pool; each worker receives the cleaned
+frame once, when it starts, and draws with the Agg backend.
+"""
+
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from .compact import compact_frame, with_derived
+from .profiling import profiler
+
+
+# Frame shared by the figures rendered in a worker process
+_recent_grads = None
+
+
+def _init_worker(recent_grads, profile=False):
+    global _recent_grads
+    profiler.enabled = profile
+    import matplotlib
+    matplotlib.use('Agg')
+    # Once per worker: a compact frame gains its derived columns here, so every figure
+    # gets the same frame and with it the same shared histogram index
+    _recent_grads = with_derived(recent_grads)
+
+
+def render_figure(recent_grads, name, out_dir, formats=('png',), dpi=100):
+    """Draw figure `name` and save one file per format; returns the written paths."""
+    from .plots import FIGURES
+    start = time.perf_counter()
+    paths = []
+    with profiler.stage('render'), profiler.stage(name, rows=len(recent_grads)):
+        # A compact frame carries no derived columns; they exist only while drawing.
+        # `render_all` adds them once per worker, which makes this a no-op there
+        recent_grads = with_derived(recent_grads)
+        with profiler.stage('draw'):
+            fig = FIGURES[name](recent_grads)
+        with profiler.stage('save'):
+            for fmt in formats:
+                path = os.path.join(out_dir, "{}.{}".format(name, fmt))
+                fig.savefig(path, format=fmt, dpi=dpi, bbox_inches='tight')
+                paths.append(path)
+    return name, paths, time.perf_counter() - start
+
+
+def _render_in_worker(name, out_dir, formats, dpi):
+    # Stage records made in a worker process travel back with the result
+    profiler.reset()
+    result = render_figure(_recent_grads, name, out_dir, formats, dpi)
+    return result, profiler.records
+
+
+def render_all(recent_grads, out_dir, names=None, formats=('png',), jobs=None, dpi=100):
+    """Render `names` (default: all figures) with `jobs` worker processes.
+
+    Returns a list of `(name, paths, seconds)` in the order of `names`.
+    `jobs=1` renders in the calling process.
+    """
+    from .plots import FIGURES
+    if names is None:
+        names = list(FIGURES)
+    unknown = [n for n in names if n not in FIGURES]
+    if unknown:
+        raise ValueError("Unknown figures: {}".format(', '.join(unknown)))
+    os.makedirs(out_dir, exist_ok=True)
+
+    if jobs == 1:
+        _init_worker(recent_grads, profiler.enabled)
+        return [render_figure(_recent_grads, n, out_dir, formats, dpi) for n in names]
+
+    with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker,
+                             initargs=(recent_grads, profiler.enabled)) as pool:
+        futures = [pool.submit(_render_in_worker, n, out_dir, formats, dpi) for n in names]
+        results = []
+        for future in futures:
+            result, records = future.result()
+            profiler.records.extend(records)
+            results.append(result)
+        return results
+
+
+def load(source, use_cache=True):
+    """Cleaned `recent_grads` with derived columns, from the cache when possible."""
+    if use_cache:
+        try:
+            from .cache import load_recent_grads
+            return load_recent_grads(source)
+        except ImportError:
+            pass
+    from .load import add_derived_columns, read_recent_grads
+    recent_grads, stats = read_recent_grads(source)
+    return add_derived_columns(recent_grads), stats
+
+
+def main(argv=None):
+    from .plots import FIGURES
+    parser = argparse.ArgumentParser(description="Render the college majors figures to image files.")
+    parser.add_argument('--source', default='recent-grads.csv', help="CSV to plot (default: %(default)s)")
+    parser.add_argument('--out', default='figures', help="output directory (default: %(default)s)")
+    parser.add_argument('--format', dest='formats', action='append', choices=['png', 'svg', 'pdf'],
+                        help="output format, may be repeated (default: png)")
+    parser.add_argument('--figure', dest='names', action='append', choices=list(FIGURES),
+                        help="render only this figure, may be repeated")
+    parser.add_argument('--jobs', type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument('--dpi', type=int, default=100)
+    parser.add_argument('--no-cache', action='store_true', help="always parse the CSV")
+    parser.add_argument('--profile', metavar='PATH',
+                        help="write a stage timing report to PATH (JSON) and PATH.folded (flame graph)")
+    parser.add_argument('--compact', action='store_true',
+                        help="hand workers a compact frame (categoricals, narrow numbers, no derived columns)")
+    args = parser.parse_args(argv)
+    if args.profile:
+        profiler.enabled = True
+
+    import matplotlib
+    matplotlib.use('Agg')
+    recent_grads, stats = load(args.source, use_cache=not args.no_cache)
+    print(stats)
+    if args.compact:
+        recent_grads, memory = compact_frame(recent_grads)
+        print(memory)
+    start = time.perf_counter()
+    results = render_all(recent_grads, args.out, args.names, tuple(args.formats or ['png']), args.jobs, args.dpi)
+    for name, paths, seconds in results:
+        print("{:<42} {:6.2f}s  {}".format(name, seconds, ', '.join(paths)))
+    print("Rendered {} figures in {:.2f}s".format(len(results), time.perf_counter() - start))
+    if args.profile:
+        profiler.write_json(args.profile)
+        profiler.write_collapsed(args.profile + '.folded')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,251 @@
+"""Static HTML report of the analysis, built without a notebook kernel.
+
+    python -m college_majors.report --out report
+
+Writes `index.html` with the notebook's tables (`describe()`, `majors.head(10)`,
+the top/bottom-10 comparisons, `major_categories`) and every figure in
+`FIGURES`, saved as PNG files next to it. Each section's fingerprint is
+a hash of the columns it reads, of the package's source code and of the
+rendering settings, and is recorded in `manifest.json`. A rebuild renders only
+the sections whose fingerprint changed (or whose output file is missing) and
+reuses the rest, so an unchanged report regenerates in well under a second
+and an edit to one column redraws only the figures that plot it.
+"""
+
+import argparse
+import glob
+import hashlib
+import html
+import json
+import os
+import time
+from collections import namedtuple
+
+import pandas as pd
+
+from .aggregate import aggregate_major_categories, aggregate_majors
+from .compact import with_derived
+from .compare import top_bottom
+from .profiling import profiler
+
+
+Section = namedtuple('Section', ['name', 'title', 'columns', 'build'])
+Section.__doc__ = """A table (`build` returns its HTML) or, with `build=None`, the figure `name`.
+
+`columns` are the `recent_grads` columns the section reads; None means all.
+"""
+
+ReportResult = namedtuple('ReportResult', ['path', 'rebuilt', 'reused'])
+
+MANIFEST = 'manifest.json'
+
+# Columns each figure reads; a figure missing here is assumed to read all of them
+FIGURE_COLUMNS = {
+    'median_vs_sample_size': ['Sample_size', 'Median'],
+    'unemployment_rate_vs_sample_size': ['Sample_size', 'Unemployment_rate'],
+    'median_vs_full_time': ['Full_time', 'Median'],
+    'unemployment_rate_vs_sharewomen': ['ShareWomen', 'Unemployment_rate'],
+    'median_vs_men': ['Men', 'Median'],
+    'median_sal_vs_total_grads': ['Major', 'Men', 'Women', 'Median'],
+    'median_vs_sharewomen': ['ShareWomen', 'Median'],
+    'median_vs_sharewomen_zoomed': ['ShareWomen', 'Median'],
+    'median_vs_sharefull_time': ['ShareFull_time', 'Median'],
+    'median_vs_sharefull_time_zoomed': ['ShareFull_time', 'Median'],
+    'column_histograms': ['Sample_size', 'Median', 'Employed', 'Full_time', 'ShareWomen', 'Unemployment_rate',
+                          'Men', 'Women'],
+    'sharewomen_histogram': ['ShareWomen'],
+    'sharemen_histogram': ['ShareMen'],
+    'median_histogram': ['Median'],
+    'sample_size_median_matrix': ['Sample_size', 'Median'],
+    'sample_size_median_unemployment_matrix': ['Sample_size', 'Median', 'Unemployment_rate'],
+    'top_bottom_sharewomen': ['Rank', 'ShareWomen'],
+    'top_bottom_unemployment_rate': ['Rank', 'Unemployment_rate'],
+    'category_shares': ['Major_category', 'ShareWomen', 'ShareMen'],
+    'category_salaries': ['Major_category', 'P25th', 'Median', 'P75th', 'Full_time_year_round'],
+    'category_jobs': ['Major_category', 'Employed', 'Unemployed', 'College_jobs', 'Non_college_jobs',
+                      'Low_wage_jobs'],
+    'median_box': ['Median'],
+    'unemployment_rate_box': ['Unemployment_rate'],
+    'unemployment_rate_vs_sharewomen_hexbin': ['ShareWomen', 'Unemployment_rate'],
+}
+
+
+def _format_float(value):
+    # Salaries and counts as whole numbers, shares and rates to four places
+    return '{:,.0f}'.format(value) if abs(value) >= 100 else '{:.4f}'.format(value)
+
+
+def _table(frame, **kwargs):
+    return frame.to_html(border=0, float_format=_format_float, **kwargs)
+
+
+def _describe(recent_grads):
+    # In[4]
+    return _table(recent_grads.describe())
+
+
+def _majors_head(recent_grads):
+    # In[18]
+    return _table(aggregate_majors(recent_grads).head(10))
+
+
+def _major_categories(recent_grads):
+    # In[39]
+    return _table(aggregate_major_categories(recent_grads))
+
+
+def _top_bottom_table(metric):
+    # In[33]-In[35]
+    def build(recent_grads):
+        result = top_bottom(recent_grads, metric, k=10)
+        table = _table(result.frame[['Rank', 'Major', 'Major_category', metric]], index=False)
+        return table + "<p>Mean {}: top 10 {:.4f}, bottom 10 {:.4f}</p>".format(
+            html.escape(metric), result.top_mean, result.bottom_mean)
+    return build
+
+
+def _figure(name):
+    return Section(name, name.replace('_', ' ').capitalize(), FIGURE_COLUMNS.get(name), None)
+
+
+# In notebook order
+SECTIONS = (
+    [Section('describe', 'recent_grads.describe()', None, _describe)] +
+    [_figure(n) for n in ['median_vs_sample_size', 'unemployment_rate_vs_sample_size', 'median_vs_full_time',
+                          'unemployment_rate_vs_sharewomen', 'median_vs_men']] +
+    [Section('majors_head', 'majors.head(10)', ['Major', 'Men', 'Women', 'Median'], _majors_head)] +
+    [_figure(n) for n in ['median_sal_vs_total_grads', 'median_vs_sharewomen', 'median_vs_sharewomen_zoomed',
+                          'median_vs_sharefull_time', 'median_vs_sharefull_time_zoomed', 'column_histograms',
+                          'sharewomen_histogram', 'sharemen_histogram', 'median_histogram',
+                          'sample_size_median_matrix', 'sample_size_median_unemployment_matrix',
+                          'numeric_columns_matrix']] +
+    [Section('top_bottom_sharewomen_table', 'Top 10 vs. bottom 10 majors by Rank: ShareWomen',
+             ['Rank', 'Major', 'Major_category', 'ShareWomen'], _top_bottom_table('ShareWomen')),
+     _figure('top_bottom_sharewomen'),
+     Section('top_bottom_unemployment_rate_table', 'Top 10 vs. bottom 10 majors by Rank: Unemployment_rate',
+             ['Rank', 'Major', 'Major_category', 'Unemployment_rate'], _top_bottom_table('Unemployment_rate')),
+     _figure('top_bottom_unemployment_rate'),
+     Section('major_categories', 'major_categories', ['Major_category', 'ShareWomen', 'ShareMen'],
+             _major_categories)] +
+    [_figure(n) for n in ['category_shares', 'category_salaries', 'category_jobs', 'median_box',
+                          'unemployment_rate_box', 'unemployment_rate_vs_sharewomen_hexbin']]
+)
+
+
+def code_fingerprint():
+    """Hash of the package's source files; any code change invalidates every section."""
+    digest = hashlib.sha256()
+    for path in sorted(glob.glob(os.path.join(os.path.dirname(os.path.abspath(__file__)), '*.py'))):
+        with open(path, 'rb') as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+def section_fingerprint(recent_grads, section, code, dpi):
+    """Hash of everything `section`'s output depends on."""
+    columns = list(recent_grads.columns) if section.columns is None else section.columns
+    frame = recent_grads[columns]
+    digest = hashlib.sha256()
+    digest.update(json.dumps([section.name, code, dpi, columns, [str(t) for t in frame.dtypes]]).encode('utf-8'))
+    digest.update(pd.util.hash_pandas_object(frame, index=True).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+def _output_path(out_dir, section):
+    if section.build is None:
+        return os.path.join(out_dir, 'figures', section.name + '.png')
+    return os.path.join(out_dir, 'sections', section.name + '.html')
+
+
+def _read_manifest(out_dir):
+    try:
+        with open(os.path.join(out_dir, MANIFEST)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _page(sections, out_dir, stats):
+    parts = ['<!DOCTYPE html>', '<html><head><meta charset="utf-8">',
+             '<title>Visualizing Earnings Based On College Majors</title>',
+             '<style>body{font-family:sans-serif;max-width:1100px;margin:auto}'
+             'table.dataframe{border-collapse:collapse;font-size:0.85em}'
+             'table.dataframe td,table.dataframe th{padding:2px 8px;text-align:right}'
+             'img{max-width:100%}</style>',
+             '</head><body>', '<h1>Visualizing Earnings Based On College Majors</h1>']
+    if stats is not None:
+        parts.append('<pre>{}</pre>'.format(html.escape(str(stats))))
+    for section in sections:
+        parts.append('<h2 id="{0}">{1}</h2>'.format(section.name, html.escape(section.title)))
+        if section.build is None:
+            parts.append('<img src="figures/{}.png" alt="{}">'.format(section.name, html.escape(section.title)))
+        else:
+            with open(_output_path(out_dir, section)) as f:
+                parts.append(f.read())
+    parts.append('</body></html>')
+    return '\n'.join(parts)
+
+
+def build_report(recent_grads, out_dir='report', stats=None, sections=SECTIONS, jobs=None, dpi=100, force=False):
+    """Write `out_dir/index.html`, rebuilding only the sections whose inputs changed.
+
+    `stats` (a `LoadStats`) is printed at the top of the page when given.
+    Returns a `ReportResult` with the page's path and the names of the
+    rebuilt and reused sections.
+    """
+    from .render import render_all
+    recent_grads = with_derived(recent_grads)
+    os.makedirs(os.path.join(out_dir, 'figures'), exist_ok=True)
+    os.makedirs(os.path.join(out_dir, 'sections'), exist_ok=True)
+
+    previous = _read_manifest(out_dir).get('sections', {})
+    code = code_fingerprint()
+    fingerprints = dict((s.name, section_fingerprint(recent_grads, s, code, dpi)) for s in sections)
+    stale = [s for s in sections if force or previous.get(s.name) != fingerprints[s.name]
+             or not os.path.exists(_output_path(out_dir, s))]
+
+    for section in stale:
+        if section.build is not None:
+            with profiler.stage('report_table'), profiler.stage(section.name, rows=len(recent_grads)):
+                fragment = section.build(recent_grads)
+            with open(_output_path(out_dir, section), 'w') as f:
+                f.write(fragment)
+    figures = [s.name for s in stale if s.build is None]
+    if figures:
+        render_all(recent_grads, os.path.join(out_dir, 'figures'), figures, ('png',), jobs, dpi)
+
+    path = os.path.join(out_dir, 'index.html')
+    with open(path, 'w') as f:
+        f.write(_page(sections, out_dir, stats))
+    # Written last, so an interrupted build is redone on the next run
+    with open(os.path.join(out_dir, MANIFEST), 'w') as f:
+        json.dump({'sections': fingerprints}, f, indent=2)
+    stale_names = set(s.name for s in stale)
+    return ReportResult(path, [s.name for s in sections if s.name in stale_names],
+                        [s.name for s in sections if s.name not in stale_names])
+
+
+def main(argv=None):
+    from .render import load
+    parser = argparse.ArgumentParser(description="Build the static HTML report, re-rendering only what changed.")
+    parser.add_argument('--source', default='recent-grads.csv')
+    parser.add_argument('--out', default='report', help="output directory (default: %(default)s)")
+    parser.add_argument('--jobs', type=int, default=None, help="worker processes for the figures")
+    parser.add_argument('--dpi', type=int, default=100)
+    parser.add_argument('--force', action='store_true', help="rebuild every section")
+    parser.add_argument('--no-cache', action='store_true', help="always parse the CSV")
+    args = parser.parse_args(argv)
+
+    import matplotlib
+    matplotlib.use('Agg')
+    start = time.perf_counter()
+    recent_grads, stats = load(args.source, use_cache=not args.no_cache)
+    result = build_report(recent_grads, args.out, stats, jobs=args.jobs, dpi=args.dpi, force=args.force)
+    print("Rebuilt {} sections, reused {}: {} ({:.2f}s)".format(len(result.rebuilt), len(result.reused), result.path,
+                                                                time.perf_counter() - start))
+    for name in result.rebuilt:
+        print("  rebuilt " + name)
+
+
+if __name__ == '__main__':
+    main()
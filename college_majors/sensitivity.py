@@ -0,0 +1,164 @@
+"""Monte Carlo sensitivity of the headline findings to survey sampling noise.
+
+In[26] finds 56% of majors predominantly female and In[20]/In[21] read a
+negative Median-ShareWomen trend off a scatter plot, but the notes to In[10]
+point out that many majors rest on a small `Sample_size`. `sensitivity` redraws
+both columns as the survey might have measured them:
+
+* `ShareWomen` as the share of women among `Sample_size` respondents,
+  `Binomial(Sample_size, ShareWomen) / Sample_size`;
+* `Median` with the large-sample standard error of a median,
+  `1.2533 * sigma / sqrt(Sample_size)`, where `sigma = (P75th - P25th) / 1.349`
+  as for a normal distribution;
+
+and recomputes the findings for every draw. Draws come in `(batch, majors)`
+arrays, so a batch of findings is a handful of reductions along the rows;
+batches run on a process pool, since NumPy's samplers hold the GIL.
+
+    python -m college_majors.sensitivity --simulations 10000
+"""
+
+import argparse
+import os
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from .compare import top_bottom_positions
+
+
+DEFAULT_SIMULATIONS = 10000
+DEFAULT_CONFIDENCE = 0.95
+
+# Upper bound on the size of one batch's arrays
+BATCH_BYTES = 32 << 20
+
+# Standard error of a median relative to that of a mean, and the IQR of a unit normal
+MEDIAN_SE_FACTOR = 1.2533
+NORMAL_IQR = 1.349
+
+# Each finding and the value that decides whether a draw agrees with the observed one
+FINDINGS = {
+    'predominantly_female': 0.5,
+    'median_sharewomen_correlation': 0.0,
+    'median_sharewomen_slope': 0.0,
+    'top_bottom_sharewomen_diff': 0.0,
+}
+
+SensitivityResult = namedtuple('SensitivityResult', ['observed', 'samples', 'summary'])
+SensitivityResult.__doc__ = """Observed findings (Series), the findings of every draw and their summary."""
+
+
+def _findings(share, median, top, bottom):
+    """Every finding for each row of the `(draws, majors)` arrays `share` and `median`."""
+    n = share.shape[1]
+    share_centered = share - share.mean(axis=1, keepdims=True)
+    median_centered = median - median.mean(axis=1, keepdims=True)
+    cov = (share_centered * median_centered).sum(axis=1)
+    share_ss = (share_centered ** 2).sum(axis=1)
+    median_ss = (median_centered ** 2).sum(axis=1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return {
+            # The upper bar of the two-bin histogram in In[25]
+            'predominantly_female': np.count_nonzero(share >= 0.5, axis=1) / n,
+            'median_sharewomen_correlation': cov / np.sqrt(share_ss * median_ss),
+            # Least-squares dollars of Median per unit of ShareWomen
+            'median_sharewomen_slope': cov / share_ss,
+            # In[33]-In[34]: top 10 minus bottom 10 majors by Rank
+            'top_bottom_sharewomen_diff': share[:, top].mean(axis=1) - share[:, bottom].mean(axis=1),
+        }
+
+
+# Inputs shared by every batch in a worker process
+_inputs = None
+
+
+def _init_worker(inputs):
+    global _inputs
+    _inputs = inputs
+
+
+def _simulate_batch(size, seed):
+    share, median, median_se, sample_size, top, bottom = _inputs
+    rng = np.random.default_rng(seed)
+    trials = np.maximum(sample_size, 1)
+    drawn = rng.binomial(trials, share, size=(size, len(share))) / trials
+    # Majors without respondents keep their reported share
+    drawn = np.where(sample_size > 0, drawn, share)
+    noisy_median = median + rng.standard_normal((size, len(median))) * median_se
+    return _findings(drawn, noisy_median, top, bottom)
+
+
+def sensitivity_inputs(recent_grads, k=10):
+    """The arrays a simulation needs, from a cleaned frame: shares, medians, their noise and the top/bottom rows."""
+    share = np.clip(recent_grads['ShareWomen'].to_numpy(dtype='float64'), 0, 1)
+    median = recent_grads['Median'].to_numpy(dtype='float64')
+    sample_size = recent_grads['Sample_size'].to_numpy(dtype='int64')
+    sigma = (recent_grads['P75th'].to_numpy(dtype='float64') - recent_grads['P25th'].to_numpy(dtype='float64'))
+    with np.errstate(invalid='ignore', divide='ignore'):
+        median_se = np.where(sample_size > 0, MEDIAN_SE_FACTOR * np.abs(sigma) / NORMAL_IQR / np.sqrt(sample_size),
+                             0.0)
+    top, bottom = top_bottom_positions(recent_grads['Rank'].to_numpy(), k)
+    return share, median, median_se, sample_size, top, bottom
+
+
+def sensitivity(recent_grads, n_sims=DEFAULT_SIMULATIONS, confidence=DEFAULT_CONFIDENCE, seed=0, jobs=None):
+    """Distributions of the `FINDINGS` under sampling noise; see `SensitivityResult`.
+
+    `summary` has one row per finding: the observed value, the mean, standard
+    deviation and `confidence` interval over the draws, and `agrees`, the share
+    of draws on the same side of the finding's threshold as the observed value.
+    `jobs=1` simulates in the calling process.
+    """
+    inputs = sensitivity_inputs(recent_grads)
+    share, median, median_se, sample_size, top, bottom = inputs
+    observed = pd.Series(dict((name, float(values[0])) for name, values in
+                              _findings(share[None, :], median[None, :], top, bottom).items()))
+
+    jobs = jobs or os.cpu_count() or 1
+    # Enough batches to keep every worker busy, none larger than BATCH_BYTES
+    per_batch = max(1, BATCH_BYTES // (8 * 4 * max(len(share), 1)))
+    batch = int(max(1, min(per_batch, -(-n_sims // jobs))))
+    sizes = [min(batch, n_sims - start) for start in range(0, n_sims, batch)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    if jobs == 1 or len(sizes) == 1:
+        _init_worker(inputs)
+        results = [_simulate_batch(size, s) for size, s in zip(sizes, seeds)]
+    else:
+        with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker, initargs=(inputs,)) as pool:
+            results = list(pool.map(_simulate_batch, sizes, seeds))
+    samples = pd.DataFrame(dict((name, np.concatenate([r[name] for r in results]) if results else np.empty(0))
+                                for name in FINDINGS))
+
+    tail = (1 - confidence) / 2
+    summary = pd.DataFrame({'observed': observed, 'mean': samples.mean(), 'std': samples.std(),
+                            'low': samples.quantile(tail), 'high': samples.quantile(1 - tail)})
+    threshold = pd.Series(FINDINGS)
+    summary['agrees'] = (np.sign(samples - threshold) == np.sign(observed - threshold)).mean()
+    return SensitivityResult(observed, samples, summary)
+
+
+def main(argv=None):
+    from .load import read_recent_grads
+    parser = argparse.ArgumentParser(description="How robust are the headline findings to sampling noise?")
+    parser.add_argument('--source', default='recent-grads.csv')
+    parser.add_argument('--simulations', type=int, default=DEFAULT_SIMULATIONS)
+    parser.add_argument('--confidence', type=float, default=DEFAULT_CONFIDENCE)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--jobs', type=int, default=None)
+    parser.add_argument('--output', help="write every draw's findings to this CSV file")
+    args = parser.parse_args(argv)
+
+    recent_grads, _ = read_recent_grads(args.source)
+    result = sensitivity(recent_grads, args.simulations, args.confidence, args.seed, args.jobs)
+    if args.output:
+        result.samples.to_csv(args.output, index=False)
+    with pd.option_context('display.width', 200, 'display.max_columns', None,
+                           'display.float_format', '{:.4g}'.format):
+        print(result.summary)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,340 @@
+"""Local HTTP service for the zoomable earnings plots, backed by an image cache.
+
+    python -m college_majors.server --port 8050 --warm
+
+Analysts zoom into Median vs. ShareWomen (In[20]/In[21]), Median vs.
+ShareFull_time (In[22]/In[23]) and the Unemployment_rate vs. ShareWomen hexbin
+(In[43]) and filter by `Major_category`. At startup every plot's points are
+counted once into a `BinPyramid`: per-category 2D histograms at 2, 4, ...,
+2**levels bins per axis. A view then needs the rows themselves only when few
+enough points are visible to draw them one by one; otherwise its image comes
+from the pyramid level that matches the zoom. Rendered PNGs are kept in an LRU
+cache keyed by (data version, plot, categories, viewport, size), so a repeated
+view is a dictionary lookup.
+
+Endpoints:
+
+* `GET /plots` lists the plots, their default viewports and the categories.
+* `GET /plot/<name>.png?category=...&xmin=&xmax=&ymin=&ymax=&width=&height=`
+  returns the image; `category` may repeat, and the `X-Render-Cache` header
+  says whether it was a `hit` or a `miss`.
+* `GET /stats` returns the image cache's counters.
+"""
+
+import argparse
+import io
+import json
+import threading
+from collections import namedtuple
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import numpy as np
+import pandas as pd
+
+from .plots import SCATTER_MAX_POINTS
+from .query import QueryCache, dataset_version
+
+
+PlotSpec = namedtuple('PlotSpec', ['x', 'y', 'kind', 'title', 'xlim', 'ylim'])
+
+# Default viewports are the notebook's zoomed views where it has one
+PLOTS = {
+    'median_vs_sharewomen': PlotSpec('ShareWomen', 'Median', 'scatter', 'Median vs. ShareWomen',
+                                     (0, 1), (20000, 80000)),
+    'median_vs_sharefull_time': PlotSpec('ShareFull_time', 'Median', 'scatter', 'Median vs. ShareFull_Time',
+                                         (0.4, 1.0), (0, 80000)),
+    'unemployment_rate_vs_sharewomen_hexbin': PlotSpec('ShareWomen', 'Unemployment_rate', 'hexbin',
+                                                       'Unemployment_rate vs. ShareWomen', None, None),
+}
+
+# The finest pyramid level has 2**PYRAMID_LEVELS bins per axis
+PYRAMID_LEVELS = 8
+# A binned view uses the coarsest level with at least this many bins across the viewport
+SCREEN_BINS = 120
+DEFAULT_SIZE = (400, 400)
+MAX_PIXELS = 2000
+DPI = 100
+
+
+class BinPyramid:
+    """Per-group 2D histograms of `(x, y)` at every power-of-two resolution.
+
+    Level `k` holds `2**k` bins per axis over the data's extent; each level is
+    the previous one with 2x2 blocks summed, so only the finest is counted from
+    the rows.
+    """
+
+    def __init__(self, x, y, codes, n_groups, levels=PYRAMID_LEVELS):
+        x = np.asarray(x, dtype='float64')
+        y = np.asarray(y, dtype='float64')
+        codes = np.asarray(codes)
+        keep = np.isfinite(x) & np.isfinite(y) & (codes >= 0)
+        x, y, codes = x[keep], y[keep], codes[keep]
+        self.n_groups = n_groups
+        self.extent = (_span(x), _span(y))
+
+        size = 1 << levels
+        ix = self._bin(x, self.extent[0], size)
+        iy = self._bin(y, self.extent[1], size)
+        finest = np.bincount((codes * size + ix) * size + iy, minlength=n_groups * size * size)
+        grids = [finest.reshape(n_groups, size, size)]
+        while size > 1:
+            size //= 2
+            grids.append(grids[-1].reshape(n_groups, size, 2, size, 2).sum(axis=(2, 4)))
+        # levels[k] has 2**k bins per axis; totals[k] is the same summed over groups
+        self.levels = grids[::-1]
+        self.totals = [grid.sum(axis=0) for grid in self.levels]
+
+    @staticmethod
+    def _bin(values, span, size):
+        if not len(values):
+            return np.zeros(0, dtype='intp')
+        positions = (values - span[0]) / (span[1] - span[0]) * size
+        return np.clip(positions.astype('intp'), 0, size - 1)
+
+    def level_for(self, xlim, ylim, target=SCREEN_BINS):
+        """Coarsest level showing at least `target` bins across the narrower side of the viewport."""
+        fraction = min((xlim[1] - xlim[0]) / (self.extent[0][1] - self.extent[0][0]),
+                       (ylim[1] - ylim[0]) / (self.extent[1][1] - self.extent[1][0]))
+        for k in range(len(self.levels)):
+            if (1 << k) * fraction >= target:
+                return k
+        return len(self.levels) - 1
+
+    def window(self, xlim, ylim, groups=None, level=None):
+        """`(counts, extent)` of the bins overlapping the viewport, summed over `groups` (default: all).
+
+        `counts` is indexed `[x, y]`; `extent` is `(x0, x1, y0, y1)` of the
+        returned bins, which may reach a little past the viewport.
+        """
+        if level is None:
+            level = self.level_for(xlim, ylim)
+        size = 1 << level
+        grid = self.totals[level] if groups is None else self.levels[level][list(groups)].sum(axis=0)
+        (x_lo, x_hi), (y_lo, y_hi) = self.extent
+        x_width = (x_hi - x_lo) / size
+        y_width = (y_hi - y_lo) / size
+        i0, i1 = _bin_range(xlim, x_lo, x_width, size)
+        j0, j1 = _bin_range(ylim, y_lo, y_width, size)
+        extent = (x_lo + i0 * x_width, x_lo + i1 * x_width, y_lo + j0 * y_width, y_lo + j1 * y_width)
+        return grid[i0:i1, j0:j1], extent
+
+
+def _span(values):
+    if not len(values):
+        return (0.0, 1.0)
+    low, high = float(values.min()), float(values.max())
+    if high <= low:
+        # A single distinct value still needs a bin of non-zero width
+        return (low - 0.5, high + 0.5)
+    return (low, high)
+
+
+def _bin_range(lim, low, width, size):
+    start = int(np.clip(np.floor((lim[0] - low) / width), 0, size))
+    stop = int(np.clip(np.ceil((lim[1] - low) / width), start, size))
+    return start, stop
+
+
+class PlotService:
+    """Renders the `PLOTS` views of one `recent_grads` frame, caching the PNGs.
+
+    Views with at most `max_points` visible rows are drawn point by point (or
+    as a true hexbin); denser ones are drawn from the pyramid. Misses are drawn
+    one at a time, since matplotlib's text and font caches are not thread-safe;
+    hits never wait for a draw.
+    """
+
+    def __init__(self, recent_grads, version=None, max_points=SCATTER_MAX_POINTS, maxsize=512,
+                 levels=PYRAMID_LEVELS):
+        self.recent_grads = recent_grads
+        self.version = version if version is not None else dataset_version(recent_grads)
+        self.max_points = max_points
+        codes, uniques = pd.factorize(np.asarray(recent_grads['Major_category']), sort=True)
+        self.codes = codes
+        self.categories = list(uniques)
+        self.pyramids = {}
+        for name, spec in PLOTS.items():
+            self.pyramids[name] = BinPyramid(recent_grads[spec.x].to_numpy(dtype='float64', na_value=np.nan),
+                                             recent_grads[spec.y].to_numpy(dtype='float64', na_value=np.nan),
+                                             codes, len(uniques), levels)
+        self.cache = QueryCache(maxsize)
+        self._draw_lock = threading.Lock()
+
+    def viewport(self, name, xlim=None, ylim=None):
+        """The viewport a view of `name` shows: the given limits, else the plot's default, else the data extent."""
+        spec = PLOTS[name]
+        extent = self.pyramids[name].extent
+        xlim = xlim or spec.xlim or extent[0]
+        ylim = ylim or spec.ylim or extent[1]
+        return (float(xlim[0]), float(xlim[1])), (float(ylim[0]), float(ylim[1]))
+
+    def _groups(self, categories):
+        if not categories:
+            return None
+        unknown = [c for c in categories if c not in self.categories]
+        if unknown:
+            raise ValueError("Unknown Major_category: {}".format(', '.join(unknown)))
+        return tuple(sorted(self.categories.index(c) for c in set(categories)))
+
+    def view(self, name, categories=None, xlim=None, ylim=None, size=DEFAULT_SIZE):
+        """`(png_bytes, cached)` for plot `name` restricted to `categories` within the viewport."""
+        if name not in PLOTS:
+            raise KeyError(name)
+        groups = self._groups(categories)
+        xlim, ylim = self.viewport(name, xlim, ylim)
+        if not (xlim[1] > xlim[0] and ylim[1] > ylim[0]):
+            raise ValueError("Empty viewport {} x {}".format(xlim, ylim))
+        size = (int(size[0]), int(size[1]))
+        drawn = []
+
+        def compute():
+            drawn.append(True)
+            return self._render(name, groups, xlim, ylim, size)
+        png = self.cache.get((self.version, name, groups, xlim, ylim, size), compute)
+        return png, not drawn
+
+    def warm(self, names=None, size=DEFAULT_SIZE):
+        """Render the default view of every plot, for all categories and for each one alone."""
+        filters = [None] + [[c] for c in self.categories]
+        for name in names or PLOTS:
+            for categories in filters:
+                self.view(name, categories, size=size)
+
+    def _rows(self, spec, groups, xlim, ylim):
+        x = self.recent_grads[spec.x].to_numpy(dtype='float64', na_value=np.nan)
+        y = self.recent_grads[spec.y].to_numpy(dtype='float64', na_value=np.nan)
+        visible = (x >= xlim[0]) & (x <= xlim[1]) & (y >= ylim[0]) & (y <= ylim[1])
+        if groups is not None:
+            visible &= np.isin(self.codes, groups)
+        return x[visible], y[visible]
+
+    def _render(self, name, groups, xlim, ylim, size):
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+        from matplotlib.figure import Figure
+
+        spec = PLOTS[name]
+        pyramid = self.pyramids[name]
+        # The pyramid bounds the visible count from above, so a large frame is only
+        # scanned row by row when the answer is known to be small
+        counts, extent = pyramid.window(xlim, ylim, groups)
+        with self._draw_lock:
+            fig = Figure(figsize=(size[0] / DPI, size[1] / DPI), dpi=DPI, layout='constrained')
+            FigureCanvasAgg(fig)
+            ax = fig.add_subplot()
+            if counts.sum() <= self.max_points:
+                x, y = self._rows(spec, groups, xlim, ylim)
+                if spec.kind == 'hexbin':
+                    ax.hexbin(x, y, gridsize=25, extent=xlim + ylim, mincnt=1, cmap='Blues')
+                else:
+                    ax.scatter(x, y, s=8)
+            elif counts.size:
+                image = ax.imshow(np.ma.masked_equal(counts.T, 0), origin='lower', aspect='auto',
+                                  interpolation='nearest', extent=extent, cmap='Blues')
+                fig.colorbar(image, ax=ax, label='count')
+            ax.set_xlim(*xlim)
+            ax.set_ylim(*ylim)
+            ax.set_xlabel(spec.x)
+            ax.set_ylabel(spec.y)
+            ax.set_title(spec.title)
+            buffer = io.BytesIO()
+            fig.savefig(buffer, format='png')
+        return buffer.getvalue()
+
+    def describe(self):
+        """What `GET /plots` returns."""
+        plots = {}
+        for name, spec in PLOTS.items():
+            xlim, ylim = self.viewport(name)
+            plots[name] = {'x': spec.x, 'y': spec.y, 'kind': spec.kind, 'xlim': xlim, 'ylim': ylim}
+        return {'plots': plots, 'categories': self.categories, 'version': self.version}
+
+
+def _limits(query, low, high):
+    if low not in query and high not in query:
+        return None
+    return float(query[low][0]), float(query[high][0])
+
+
+class PlotRequestHandler(BaseHTTPRequestHandler):
+    """Serves `self.server.service`, a `PlotService`."""
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        service = self.server.service
+        if url.path == '/plots':
+            return self._send_json(service.describe())
+        if url.path == '/stats':
+            return self._send_json(service.cache.stats())
+        if url.path.startswith('/plot/') and url.path.endswith('.png'):
+            return self._send_view(url.path[len('/plot/'):-len('.png')], parse_qs(url.query))
+        self.send_error(404, "Unknown path")
+
+    def _send_view(self, name, query):
+        if name not in PLOTS:
+            return self.send_error(404, "Unknown plot {!r}".format(name))
+        try:
+            xlim = _limits(query, 'xmin', 'xmax')
+            ylim = _limits(query, 'ymin', 'ymax')
+            size = [min(max(int(query.get(k, [d])[0]), 50), MAX_PIXELS)
+                    for k, d in zip(('width', 'height'), DEFAULT_SIZE)]
+            png, cached = self.server.service.view(name, query.get('category'), xlim, ylim, size)
+        except (KeyError, ValueError) as error:
+            return self.send_error(400, str(error))
+        self.send_response(200)
+        self.send_header('Content-Type', 'image/png')
+        self.send_header('Content-Length', str(len(png)))
+        self.send_header('X-Render-Cache', 'hit' if cached else 'miss')
+        self.end_headers()
+        self.wfile.write(png)
+
+    def _send_json(self, payload):
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+def make_server(service, host='127.0.0.1', port=8050, verbose=False):
+    """A `ThreadingHTTPServer` answering with `service`; call `serve_forever()` on it."""
+    server = ThreadingHTTPServer((host, port), PlotRequestHandler)
+    server.service = service
+    server.verbose = verbose
+    return server
+
+
+def main(argv=None):
+    from .render import load
+    parser = argparse.ArgumentParser(description="Serve the zoomable earnings plots over HTTP.")
+    parser.add_argument('--source', default='recent-grads.csv')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8050)
+    parser.add_argument('--cache-size', type=int, default=512, help="rendered images kept in memory")
+    parser.add_argument('--warm', action='store_true', help="render every default view before serving")
+    parser.add_argument('--no-cache', action='store_true', help="always parse the CSV")
+    parser.add_argument('--verbose', action='store_true', help="log every request")
+    args = parser.parse_args(argv)
+
+    recent_grads, stats = load(args.source, use_cache=not args.no_cache)
+    service = PlotService(recent_grads, maxsize=args.cache_size)
+    if args.warm:
+        service.warm()
+    server = make_server(service, args.host, args.port, args.verbose)
+    print("Serving {} plots on http://{}:{}/plots".format(len(PLOTS), args.host, server.server_port))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,152 @@
+"""Invariant checks for incoming `recent_grads` rows, with a quarantine for the failures.
+
+In[7] drops rows with gaps and says nothing else; the rest of the notebook
+assumes, without checking, that
+
+* `Men + Women == Total`,
+* `Unemployment_rate == Unemployed / (Unemployed + Employed)`,
+* `P25th <= Median <= P75th`,
+* `ShareWomen == Women / Total`.
+
+`validate` evaluates every check as a NumPy expression over whole columns, each
+column converted once, and packs the outcome into one bit per check per row.
+The reasons of a flagged row are the names of its set bits, looked up per
+distinct bit pattern instead of per row, so the cost stays linear in the rows
+and does not grow with the number of failures.
+
+    python -m college_majors.validate --source recent-grads.csv --quarantine quarantine.csv
+"""
+
+import argparse
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+from .load import DEFAULT_CHUNKSIZE
+from .profiling import profiler
+
+
+Check = namedtuple('Check', ['name', 'columns', 'violated'])
+Check.__doc__ = """`violated(values, tolerances)` returns a boolean array; `values` maps column -> float64 array.
+
+A check never flags a row for a missing input; `missing_values` does that.
+"""
+
+ValidationResult = namedtuple('ValidationResult', ['valid', 'quarantined', 'counts'])
+ValidationResult.__doc__ = """`valid` rows, `quarantined` rows with a `reasons` column, and failures per check."""
+
+# Counts must match exactly; rates and shares are stored as floats, possibly float32
+DEFAULT_TOLERANCES = {'count': 0.0, 'rate': 1e-6}
+
+REASON_SEPARATOR = ';'
+
+
+def _ratio(numerator, denominator):
+    # An empty denominator is recorded as a rate of 0 (e.g. MILITARY TECHNOLOGIES)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where(denominator > 0, numerator / np.where(denominator > 0, denominator, 1), 0.0)
+
+
+def _total_mismatch(v, tol):
+    return np.abs(v['Men'] + v['Women'] - v['Total']) > tol['count']
+
+
+def _unemployment_rate_mismatch(v, tol):
+    expected = _ratio(v['Unemployed'], v['Unemployed'] + v['Employed'])
+    return np.abs(v['Unemployment_rate'] - expected) > tol['rate']
+
+
+def _salary_order(v, tol):
+    return (v['P25th'] > v['Median']) | (v['Median'] > v['P75th'])
+
+
+def _share_women_mismatch(v, tol):
+    return np.abs(v['ShareWomen'] - _ratio(v['Women'], v['Total'])) > tol['rate']
+
+
+CHECKS = [
+    Check('total_mismatch', ['Men', 'Women', 'Total'], _total_mismatch),
+    Check('unemployment_rate_mismatch', ['Unemployment_rate', 'Unemployed', 'Employed'],
+          _unemployment_rate_mismatch),
+    Check('salary_order', ['P25th', 'Median', 'P75th'], _salary_order),
+    Check('share_women_mismatch', ['ShareWomen', 'Women', 'Total'], _share_women_mismatch),
+]
+
+MISSING = 'missing_values'
+
+
+def violation_flags(recent_grads, checks=CHECKS, tolerances=None):
+    """One integer per row with bit `i` set when `checks[i]` fails and the last bit for missing values.
+
+    Checks whose columns are absent from the frame are skipped.
+    """
+    tol = dict(DEFAULT_TOLERANCES, **(tolerances or {}))
+    needed = sorted(set(c for check in checks for c in check.columns if c in recent_grads.columns))
+    values = dict((c, recent_grads[c].to_numpy(dtype='float64', na_value=np.nan)) for c in needed)
+    flags = np.zeros(len(recent_grads), dtype='int64')
+    with np.errstate(invalid='ignore'):
+        for bit, check in enumerate(checks):
+            if all(c in values for c in check.columns):
+                flags |= check.violated(values, tol).astype('int64') << bit
+    flags |= recent_grads.isna().any(axis=1).to_numpy().astype('int64') << len(checks)
+    return flags
+
+
+def reasons(flags, checks=CHECKS):
+    """Categorical of `;`-joined check names for each entry of `flags`, empty where 0."""
+    names = [check.name for check in checks] + [MISSING]
+    patterns, codes = np.unique(flags, return_inverse=True)
+    labels = [REASON_SEPARATOR.join(n for bit, n in enumerate(names) if pattern >> bit & 1) for pattern in patterns]
+    # Distinct bit patterns give distinct labels, so they can serve as the categories directly
+    return pd.Categorical.from_codes(codes.reshape(-1), categories=labels)
+
+
+def validate(recent_grads, checks=CHECKS, tolerances=None):
+    """Split `recent_grads` into valid and quarantined rows; see `ValidationResult`.
+
+    `tolerances` overrides entries of `DEFAULT_TOLERANCES`: the absolute
+    difference allowed between `Men + Women` and `Total` (`'count'`), and
+    between a rate or share and the value recomputed from the counts (`'rate'`).
+    """
+    with profiler.stage('validate', rows=len(recent_grads)):
+        flags = violation_flags(recent_grads, checks, tolerances)
+        bad = np.flatnonzero(flags)
+        names = [check.name for check in checks] + [MISSING]
+        counts = pd.Series([int(np.count_nonzero(flags >> bit & 1)) for bit in range(len(names))],
+                           index=names, name='rows')
+        quarantined = recent_grads.take(bad)
+        quarantined['reasons'] = reasons(flags[bad], checks)
+        # The usual case of a clean ingest hands the frame back without copying it
+        valid = recent_grads if not len(bad) else recent_grads.take(np.flatnonzero(flags == 0))
+        return ValidationResult(valid, quarantined, counts)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check the survey invariants and quarantine the rows that fail.")
+    parser.add_argument('--source', default='recent-grads.csv')
+    parser.add_argument('--quarantine', help="write the failing rows, with their reasons, to this CSV file")
+    parser.add_argument('--count-tolerance', type=float, default=DEFAULT_TOLERANCES['count'])
+    parser.add_argument('--rate-tolerance', type=float, default=DEFAULT_TOLERANCES['rate'])
+    parser.add_argument('--chunksize', type=int, default=DEFAULT_CHUNKSIZE)
+    args = parser.parse_args(argv)
+
+    tolerances = {'count': args.count_tolerance, 'rate': args.rate_tolerance}
+    rows = valid = 0
+    counts = None
+    header = True
+    for chunk in pd.read_csv(args.source, chunksize=args.chunksize):
+        result = validate(chunk, tolerances=tolerances)
+        rows += len(chunk)
+        valid += len(result.valid)
+        counts = result.counts if counts is None else counts + result.counts
+        if args.quarantine:
+            result.quarantined.to_csv(args.quarantine, mode='w' if header else 'a', header=header, index=False)
+            header = False
+    print("{} rows, {} valid, {} quarantined".format(rows, valid, rows - valid))
+    if counts is not None:
+        print(counts.to_string())
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,45 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from college_majors.aggregate import IncrementalAggregates, aggregate_major_categories, aggregate_majors
+from college_majors.hist import predominant_fraction
+from college_majors.load import add_derived_columns, read_recent_grads
+
+
+SOURCE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'recent-grads.csv')
+
+
+@pytest.fixture(scope='module')
+def recent_grads():
+    recent_grads, _ = read_recent_grads(SOURCE)
+    return recent_grads.reset_index(drop=True)
+
+
+def _batches(recent_grads):
+    first = recent_grads.iloc[:60].copy()
+    # Missing medians, which both paths must skip
+    first['Median'] = first['Median'].astype('float64')
+    first.loc[first.index[[3, 10, 11]], 'Median'] = np.nan
+    # Mostly majors not seen before
+    second = recent_grads.iloc[50:120].copy()
+    # Only majors and categories that are already known, with other counts
+    third = recent_grads.iloc[[0, 5, 5, 70, 119]].copy()
+    third['Women'] += 1000
+    third['ShareWomen'] = third['ShareWomen'].iloc[::-1].to_numpy()
+    return [first, second, third]
+
+
+def test_incremental_matches_full_recompute(recent_grads):
+    batches = _batches(recent_grads)
+    aggregates = IncrementalAggregates()
+    for n in range(1, len(batches) + 1):
+        assert aggregates.update(batches[n - 1]) is aggregates
+        combined = add_derived_columns(pd.concat(batches[:n], ignore_index=True))
+        assert aggregates.row_count == len(combined)
+        pd.testing.assert_frame_equal(aggregates.majors(), aggregate_majors(combined))
+        pd.testing.assert_frame_equal(aggregates.major_categories(), aggregate_major_categories(combined))
+        for share in ['ShareWomen', 'ShareMen']:
+            assert aggregates.predominant_fraction(share) == pytest.approx(predominant_fraction(combined, share))
@@ -0,0 +1,34 @@
+import pandas as pd
+import pytest
+
+from college_majors.backends import run_pipeline
+
+
+HEADER = ('Rank,Major_code,Major,Total,Men,Women,Major_category,ShareWomen,Sample_size,Employed,Full_time,'
+          'Part_time,Full_time_year_round,Unemployed,Unemployment_rate,Median,P25th,P75th,College_jobs,'
+          'Non_college_jobs,Low_wage_jobs')
+
+
+def _write_rows(path, rows):
+    with open(path, 'w') as f:
+        f.write(HEADER + '\n')
+        for rank, major, men, women, category in rows:
+            f.write('{0},{0},{1},{2},{3},{4},{5},0.5,10,10,10,0,10,0,0.0,40000,30000,50000,5,5,0\n'.format(
+                rank, major, men + women, men, women, category))
+
+
+def test_backends_agree_on_sums_past_int32(tmp_path):
+    pytest.importorskip('polars')
+    path = str(tmp_path / 'large.csv')
+    _write_rows(path, [(i, 'BIG MAJOR', 300000, 300000, 'Engineering') for i in range(10000)] +
+                [(10000, 'SMALL MAJOR', 2, 1, 'Arts')])
+
+    pandas_majors, pandas_categories, pandas_stats = run_pipeline(path, 'pandas')
+    polars_majors, polars_categories, polars_stats = run_pipeline(path, 'polars')
+
+    assert pandas_majors.loc['BIG MAJOR', 'total_grads'] == 6000000000
+    assert polars_majors.loc['BIG MAJOR', 'total_grads'] == 6000000000
+    pd.testing.assert_frame_equal(polars_majors, pandas_majors, check_dtype=False)
+    pd.testing.assert_frame_equal(polars_categories, pandas_categories, check_dtype=False)
+    assert (polars_stats.raw_data_count, polars_stats.cleaned_data_count) == \
+        (pandas_stats.raw_data_count, pandas_stats.cleaned_data_count)
@@ -0,0 +1,30 @@
+import os
+
+import pandas as pd
+import pytest
+
+from college_majors.load import read_recent_grads
+
+
+SOURCE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'recent-grads.csv')
+
+
+@pytest.mark.parametrize('column, value', [('Total', 3e9), ('Men', 12.7), ('Women', -3e9)])
+def test_counts_that_do_not_fit_int32_are_rejected(tmp_path, column, value):
+    frame = pd.read_csv(SOURCE)
+    frame[column] = frame[column].astype('float64')
+    frame.loc[150, column] = value
+    path = str(tmp_path / 'bad.csv')
+    frame.to_csv(path, index=False)
+    with pytest.raises(ValueError, match=r"'{}'.*data row 151".format(column)):
+        read_recent_grads(path, chunksize=40)
+
+
+def test_counts_written_as_floats_are_accepted(tmp_path):
+    frame = pd.read_csv(SOURCE)
+    frame['Total'] = frame['Total'].astype('float64')
+    path = str(tmp_path / 'floats.csv')
+    frame.to_csv(path, index=False)
+    recent_grads, _ = read_recent_grads(path)
+    expected, _ = read_recent_grads(SOURCE)
+    pd.testing.assert_series_equal(recent_grads['Total'], expected['Total'])
@@ -0,0 +1,19 @@
+import os
+
+import pytest
+
+from college_majors.load import read_recent_grads
+from college_majors.query import Queries
+
+
+SOURCE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'recent-grads.csv')
+
+
+def test_set_data_invalidates_after_in_place_edit():
+    recent_grads, _ = read_recent_grads(SOURCE)
+    queries = Queries(recent_grads)
+    assert queries.predominant_fraction() == pytest.approx((recent_grads['ShareWomen'] >= 0.5).mean())
+
+    recent_grads['ShareWomen'] = 0.9
+    queries.set_data(recent_grads)
+    assert queries.predominant_fraction() == 1.0